@@ -5,7 +5,14 @@ from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from typing import TYPE_CHECKING
 
-from keyboards import BotKeyboards
+from keyboards import (
+    BotKeyboards,
+    CB_GOTO_PAGE,
+    CB_IMAGE_QUALITY,
+    CB_INTERVAL_HOURS,
+    CB_PAGES_PER_SEND,
+    CB_SCHEDULE_TIME,
+)
 from user_settings import UserSettings
 from logger_config import BotLogger
 from config import config
@@ -15,6 +22,13 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# current short prefix first, then the long one still on buttons in older messages
+_PAGES_PER_SEND_PREFIXES = (CB_PAGES_PER_SEND, "pages_per_send_")
+_SCHEDULE_TIME_PREFIXES = (CB_SCHEDULE_TIME, "schedule_time_")
+_INTERVAL_HOURS_PREFIXES = (CB_INTERVAL_HOURS, "interval_hours_")
+_IMAGE_QUALITY_PREFIXES = (CB_IMAGE_QUALITY, "image_quality_")
+_GOTO_PAGE_PREFIXES = (CB_GOTO_PAGE, "goto_page_")
+
 
 class SettingsStates(StatesGroup):
     """States for setting parameters"""
@@ -49,21 +63,21 @@ class CallbackHandler:
                 await self._show_user_settings(callback)
             elif data == "set_pages_per_send":
                 await self._show_pages_per_send_menu(callback)
-            elif data.startswith("pages_per_send_"):
+            elif data.startswith(_PAGES_PER_SEND_PREFIXES):
                 await self._set_pages_per_send(callback, data)
             elif data == "set_schedule_time":
                 await self._show_schedule_time_menu(callback)
-            elif data.startswith("schedule_time_"):
+            elif data.startswith(_SCHEDULE_TIME_PREFIXES):
                 await self._set_schedule_time(callback, data)
             elif data == "custom_schedule_time":
                 await self._request_custom_time(callback, state)
             elif data == "set_interval_hours":
                 await self._show_interval_hours_menu(callback)
-            elif data.startswith("interval_hours_"):
+            elif data.startswith(_INTERVAL_HOURS_PREFIXES):
                 await self._set_interval_hours(callback, data)
             elif data == "set_image_quality":
                 await self._show_image_quality_menu(callback)
-            elif data.startswith("image_quality_"):
+            elif data.startswith(_IMAGE_QUALITY_PREFIXES):
                 await self._set_image_quality(callback, data)
             elif data == "toggle_auto_send":
                 await self._toggle_auto_send(callback)
@@ -85,7 +99,7 @@ class CallbackHandler:
                 await self._show_current_page(callback)
             elif data == "goto_page":
                 await self._request_page_number(callback, state)
-            elif data.startswith("goto_page_"):
+            elif data.startswith(_GOTO_PAGE_PREFIXES):
                 await self._goto_specific_page(callback, data)
             elif data == "stats":
                 await self._show_stats(callback)
@@ -428,7 +442,7 @@ class CallbackHandler:
             user_id = callback.from_user.id
             
             # Обновляем текущую страницу в базе данных
-            self.bot.db.set_current_page(user_id, page_number)
+            await self.bot.run_db(self.bot.db.set_current_page, user_id, page_number)
             
             await callback.answer(f"Переход к странице {page_number}")
             await self._show_current_page(callback)
@@ -661,7 +675,7 @@ class CallbackHandler:
         user_id = callback.from_user.id
         pdf_path = self.bot.db.get_pdf_path(user_id)
         
-        if not pdf_path or not os.path.exists(pdf_path):
+        if not self.bot.pdf_available(pdf_path):
             await callback.message.edit_text(
                 "❌ <b>Книги не найдены</b>\n\n"
                 "У вас пока нет загруженных книг.\n"
@@ -702,7 +716,7 @@ class CallbackHandler:
         user_id = callback.from_user.id
         pdf_path = self.bot.db.get_pdf_path(user_id)
         
-        if not pdf_path or not os.path.exists(pdf_path):
+        if not self.bot.pdf_available(pdf_path):
             await callback.message.edit_text(
                 "❌ <b>Книга не загружена</b>\n\n"
                 "Сначала загрузите PDF книгу.",
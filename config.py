@@ -33,6 +33,11 @@ class Config(BaseSettings):
     # Logging configuration
     log_level: str = Field("INFO", description="Logging level", alias="LOG_LEVEL")
     log_dir: str = Field("logs", description="Directory for log files", alias="LOG_DIR")
+    log_rotation: str = Field(
+        "internal",
+        description="internal: rotate in-process; external: logrotate moves the files, the bot reopens them",
+        alias="LOG_ROTATION"
+    )
     
     # Cleanup configuration
     cleanup_interval_hours: int = Field(24, ge=1, description="Hours between cleanup runs", alias="CLEANUP_INTERVAL_HOURS")
@@ -42,6 +47,8 @@ class Config(BaseSettings):
     max_concurrent_uploads: int = Field(5, ge=1, le=20, description="Max concurrent file uploads", alias="MAX_CONCURRENT_UPLOADS")
     request_timeout: int = Field(30, ge=5, le=300, description="HTTP request timeout in seconds", alias="REQUEST_TIMEOUT")
     image_quality: int = Field(85, ge=1, le=100, description="JPEG image quality for PDF page extraction", alias="IMAGE_QUALITY")
+    page_cache_entries: int = Field(256, ge=1, description="Max rendered page images kept on disk", alias="PAGE_CACHE_ENTRIES")
+    page_cache_size_mb: int = Field(200, ge=1, description="Disk budget for rendered page images in MB", alias="PAGE_CACHE_SIZE_MB")
     
     # Security configuration
     allowed_file_types: List[str] = Field(
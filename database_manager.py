@@ -1,135 +1,431 @@
+import heapq
 import json
 import os
-from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
 from config import get_config
 
+# how many user records to keep in the id -> record lookup cache
+USER_CACHE_SIZE = 1024
+
+# how many telegram file_ids of sent page images to remember (oldest dropped first)
+PAGE_FILE_ID_LIMIT = 10000
+
+# sentinel for "field not in the record" (None is a valid stored value)
+_MISSING = object()
+
+# default achievements - maybe should be in config but whatever
+# read-only; copy with dict() before putting them into the db
+_DEFAULT_ACHIEVEMENTS = (
+    MappingProxyType({"id": "first_page", "name": "first steps", "description": "read your first page", "points": 10, "icon": "🎯"}),
+    MappingProxyType({"id": "page_10", "name": "getting started", "description": "read 10 pages", "points": 50, "icon": "📖"}),
+    MappingProxyType({"id": "page_50", "name": "bookworm", "description": "read 50 pages", "points": 100, "icon": "🐛"}),
+    MappingProxyType({"id": "page_100", "name": "dedicated reader", "description": "read 100 pages", "points": 200, "icon": "📚"}),
+    MappingProxyType({"id": "page_500", "name": "scholar", "description": "read 500 pages", "points": 500, "icon": "🎓"}),
+    MappingProxyType({"id": "daily_streak_7", "name": "week warrior", "description": "read for 7 days in a row", "points": 150, "icon": "🔥"}),
+    MappingProxyType({"id": "daily_streak_30", "name": "monthly master", "description": "read for 30 days in a row", "points": 1000, "icon": "👑"}),
+    MappingProxyType({"id": "book_complete", "name": "book finisher", "description": "complete your first book", "points": 300, "icon": "🏆"}),
+    MappingProxyType({"id": "speed_reader", "name": "speed reader", "description": "read 20 pages in one session", "points": 100, "icon": "⚡"}),
+    MappingProxyType({"id": "night_owl", "name": "night owl", "description": "read after 10 PM", "points": 25, "icon": "🦉"}),
+)
+
+# lists every db file is expected to have
+_TOP_LEVEL_KEYS = ("users", "leaderboard", "achievements", "reading_sessions")
+
+# (threshold, achievement id) pairs, sorted by threshold
+_PAGE_ACHIEVEMENT_TABLE = ((1, "first_page"), (10, "page_10"), (50, "page_50"), (100, "page_100"), (500, "page_500"))
+_STREAK_ACHIEVEMENT_TABLE = ((7, "daily_streak_7"), (30, "daily_streak_30"))
+
+_PAGE_THRESHOLDS = tuple(t for t, _ in _PAGE_ACHIEVEMENT_TABLE)
+_PAGE_ACHIEVEMENTS = tuple(a for _, a in _PAGE_ACHIEVEMENT_TABLE)
+_STREAK_THRESHOLDS = tuple(t for t, _ in _STREAK_ACHIEVEMENT_TABLE)
+_STREAK_ACHIEVEMENTS = tuple(a for _, a in _STREAK_ACHIEVEMENT_TABLE)
+
+
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    """stored iso timestamp -> datetime, None for missing/garbage"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except (ValueError, TypeError):
+        return None
+
+
+class PageFileIdStore:
+    """telegram file_ids of uploaded page images, kept out of the main db file
+
+    there are thousands of them and the db file is rewritten on every save.
+    here a new id is one line appended to a json-lines file; the file is only
+    rewritten when replaced/dropped ids make up half of it
+    """
+
+    def __init__(self, path: str, limit: int = PAGE_FILE_ID_LIMIT):
+        self.path = path
+        self.limit = limit
+        self._lock = threading.Lock()
+        # image key -> file_id, oldest first; read from the file on first use
+        self._ids: "Optional[OrderedDict[str, str]]" = None
+        self._lines = 0
+
+    def _load(self) -> "OrderedDict[str, str]":
+        if self._ids is None:
+            ids: "OrderedDict[str, str]" = OrderedDict()
+            lines = 0
+            try:
+                with open(self.path, "r", encoding="utf-8") as file:
+                    for line in file:
+                        lines += 1
+                        try:
+                            key, file_id = json.loads(line)
+                        except (ValueError, TypeError):
+                            continue  # torn line from a crash mid-append
+                        ids[key] = file_id
+                        ids.move_to_end(key)
+            except FileNotFoundError:
+                pass
+            # the file still has the ids dropped since it was last rewritten
+            while len(ids) > self.limit:
+                ids.popitem(last=False)
+            self._ids = ids
+            self._lines = lines
+        return self._ids
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            return self._load().get(key)
+
+    def update(self, items: Mapping[str, str]):
+        """store several ids at once, dropping the oldest past the limit"""
+        with self._lock:
+            ids = self._load()
+            new = [(key, file_id) for key, file_id in items.items() if ids.get(key) != file_id]
+            if not new:
+                return
+            for key, file_id in new:
+                ids[key] = file_id
+                ids.move_to_end(key)
+            while len(ids) > self.limit:
+                ids.popitem(last=False)
+
+            self._lines += len(new)
+            if self._lines > 2 * len(ids):
+                self._rewrite(ids)
+            else:
+                with open(self.path, "a", encoding="utf-8") as file:
+                    file.writelines(json.dumps(item, ensure_ascii=False) + "\n" for item in new)
+
+    def _rewrite(self, ids: Mapping[str, str]):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            file.writelines(json.dumps(item, ensure_ascii=False) + "\n" for item in ids.items())
+        os.replace(tmp_path, self.path)
+        self._lines = len(ids)
+
+
+@dataclass
+class UserState:
+    """the fields handlers check on every command, read in one go"""
+    exists: bool
+    pdf_path: Optional[str] = None
+    current_page: int = 1
+    total_pages: int = 0
+    last_sent: Optional[datetime] = None
+    user_id: Optional[int] = None
+    username: Optional[str] = None
+
 
 class DatabaseManager:
     def __init__(self, db_path: Optional[str] = None):
         self.db_path = db_path or get_config().database_path
+        # parsed copy of the json file, reused until the file changes on disk.
+        # _lock guards the in-memory data, only take it through _locked()
+        self._lock = threading.RLock()
+        self._lock_depth = 0
+        self._data: Optional[Dict[str, Any]] = None
+        self._data_stamp: Optional[tuple] = None
+        # save_data() only marks the data dirty; the outermost _locked() turns it
+        # into a json string and writes it after letting go of _lock
+        self._dirty = False
+        self._file_lock = threading.Lock()
+        self._snapshot_seq = 0
+        self._written_seq = 0
+        # id -> user record (same dict object as in self._data["users"])
+        self._user_cache: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        # achievement id -> achievement, rebuilt when the achievements list changes
+        self._achievement_index: Dict[str, Dict[str, Any]] = {}
+        self._achievement_source: Optional[list] = None
+        # file_ids live next to the db file, not in it
+        self._page_file_ids = PageFileIdStore(f"{os.path.splitext(self.db_path)[0]}.file_ids.jsonl")
         self._ensure_database_exists()
 
     def _ensure_database_exists(self):
-        """create db file if it doesnt exist"""
+        """create db file if it doesnt exist, otherwise fill in whatever is missing (one write at most)"""
         if not os.path.exists(self.db_path):
-            initial_data = {
-                "users": [],
-                "leaderboard": [],
-                "achievements": self._get_default_achievements(),
-                "reading_sessions": []
-            }
+            initial_data = {key: [] for key in _TOP_LEVEL_KEYS}
+            initial_data["achievements"] = [dict(a) for a in self._get_default_achievements()]
             self.save_data(initial_data)
+            return
+
+        data = self.load_data()
+        changed = False
+        for key in _TOP_LEVEL_KEYS:
+            if key not in data:
+                data[key] = []
+                changed = True
+        if self._populate_achievements(data):
+            changed = True
+        # older db files kept the file_ids inline
+        if "page_file_ids" in data:
+            self._page_file_ids.update(data.pop("page_file_ids"))
+            changed = True
+        if changed:
+            self.save_data(data)
     
-    def _get_default_achievements(self) -> List[Dict[str, Any]]:
-        """default achievements - maybe should be in config but whatever"""
-        return [
-            {"id": "first_page", "name": "first steps", "description": "read your first page", "points": 10, "icon": "🎯"},
-            {"id": "page_10", "name": "getting started", "description": "read 10 pages", "points": 50, "icon": "📖"},
-            {"id": "page_50", "name": "bookworm", "description": "read 50 pages", "points": 100, "icon": "🐛"},
-            {"id": "page_100", "name": "dedicated reader", "description": "read 100 pages", "points": 200, "icon": "📚"},
-            {"id": "page_500", "name": "scholar", "description": "read 500 pages", "points": 500, "icon": "🎓"},
-            {"id": "daily_streak_7", "name": "week warrior", "description": "read for 7 days in a row", "points": 150, "icon": "🔥"},
-            {"id": "daily_streak_30", "name": "monthly master", "description": "read for 30 days in a row", "points": 1000, "icon": "👑"},
-            {"id": "book_complete", "name": "book finisher", "description": "complete your first book", "points": 300, "icon": "🏆"},
-            {"id": "speed_reader", "name": "speed reader", "description": "read 20 pages in one session", "points": 100, "icon": "⚡"},
-            {"id": "night_owl", "name": "night owl", "description": "read after 10 PM", "points": 25, "icon": "🦉"}
-        ]
+    def _get_default_achievements(self) -> Tuple[Mapping[str, Any], ...]:
+        """default achievements (shared read-only mappings)"""
+        return _DEFAULT_ACHIEVEMENTS
+
+    def _populate_achievements(self, data: Dict[str, Any]) -> bool:
+        """add missing default achievements, returns True if data was changed"""
+        achievements = data.setdefault("achievements", [])
+        # cheap count check first - a fully populated db is the common case
+        if len(achievements) >= len(_DEFAULT_ACHIEVEMENTS):
+            return False
 
-    def load_data(self) -> Dict[str, Any]:
-        """load data from json db"""
+        known = {a["id"] for a in achievements}
+        missing = [dict(a) for a in _DEFAULT_ACHIEVEMENTS if a["id"] not in known]
+        achievements.extend(missing)
+        return bool(missing)
+
+    def _file_stamp(self) -> tuple:
+        """mtime + size of the db file, used to tell if our cached copy is stale"""
+        st = os.stat(self.db_path)
+        return (st.st_mtime_ns, st.st_size)
+
+    @contextmanager
+    def _locked(self):
+        """hold the data lock; changes saved inside hit the disk once the
+        outermost holder exits, outside the lock - readers never wait on a write"""
+        snapshot = None
         try:
-            with open(self.db_path, "r", encoding="utf-8") as file:
-                return json.load(file)
-        except (FileNotFoundError, json.JSONDecodeError):
-            # if file is corrupted or missing, recreate it
-            self._ensure_database_exists()
-            return self.load_data()
+            with self._lock:
+                self._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth -= 1
+                    if self._lock_depth == 0 and self._dirty:
+                        self._dirty = False
+                        self._snapshot_seq += 1
+                        snapshot = (
+                            json.dumps(self._data, indent=2, ensure_ascii=False),
+                            self._snapshot_seq,
+                        )
+        finally:
+            # even if the block raised - whatever it saved is already in memory
+            if snapshot is not None:
+                self._write_snapshot(*snapshot)
+
+    def _write_snapshot(self, payload: str, seq: int):
+        """write a serialized copy of the data, unless a newer one got there first
+
+        goes through a temp file that's swapped in, so a reader never sees a
+        half-written file (and a crash mid-write keeps the old one)
+        """
+        with self._file_lock:
+            if seq <= self._written_seq:
+                return
+            tmp_path = f"{self.db_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                file.write(payload)
+            os.replace(tmp_path, self.db_path)
+            stamp = self._file_stamp()
+            with self._lock:
+                self._written_seq = seq
+                if seq == self._snapshot_seq:
+                    self._data_stamp = stamp
+
+    def load_data(self) -> Dict[str, Any]:
+        """load data from json db (parsed once, re-read only when the file changes)"""
+        with self._locked():
+            # our own changes may still be on their way to disk - the file is older
+            if self._data is not None and (
+                self._dirty or self._snapshot_seq > self._written_seq
+            ):
+                return self._data
+            try:
+                stamp = self._file_stamp()
+                if self._data is not None and stamp == self._data_stamp:
+                    return self._data
+
+                with open(self.db_path, "r", encoding="utf-8") as file:
+                    self._data = json.load(file)
+                self._data_stamp = stamp
+                self._user_cache.clear()
+                return self._data
+            except (FileNotFoundError, json.JSONDecodeError):
+                # if file is corrupted or missing, recreate it
+                self._data = None
+                self._data_stamp = None
+                self._user_cache.clear()
+                self._ensure_database_exists()
+                return self.load_data()
 
     def save_data(self, data: Dict[str, Any]):
-        """save data to json db"""
-        with open(self.db_path, "w", encoding="utf-8") as file:
-            json.dump(data, file, indent=2, ensure_ascii=False)
+        """save data to json db
+
+        the write happens when the caller's outermost _locked() block ends
+        (right away when called on its own), see _write_snapshot()
+        """
+        with self._locked():
+            if data is not self._data:
+                self._user_cache.clear()
+            self._data = data
+            self._dirty = True
+
+    def _find_user(self, data: Dict[str, Any], user_id: int) -> Optional[Dict[str, Any]]:
+        """find user record in loaded data, going through the lru cache first"""
+        with self._locked():
+            user = self._user_cache.get(user_id)
+            if user is not None:
+                self._user_cache.move_to_end(user_id)
+                return user
+
+            for user in data.get("users", []):
+                if user["id"] == user_id:
+                    self._user_cache[user_id] = user
+                    if len(self._user_cache) > USER_CACHE_SIZE:
+                        self._user_cache.popitem(last=False)
+                    return user
+
+            return None
+
+    def _achievements_by_id(self, data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """id -> achievement lookup for the loaded data"""
+        achievements = data.get("achievements", [])
+        if achievements is not self._achievement_source:
+            self._achievement_index = {a["id"]: a for a in achievements}
+            self._achievement_source = achievements
+        return self._achievement_index
+
+    def cache_clear(self):
+        """drop cached user records and parsed data (next call re-reads the file)"""
+        with self._locked():
+            self._user_cache.clear()
+            self._achievement_index = {}
+            self._achievement_source = None
+            self._data = None
+            self._data_stamp = None
+
+    def close(self):
+        """release in-memory caches. there is no connection to close, the file is
+        opened only for the duration of each read/write"""
+        self.cache_clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
 
     def get_user_data(self, user_id: int) -> Dict[str, Any]:
         """get user data from db"""
-        data = self.load_data()
-        users = data.get("users", [])
+        with self._locked():
+            data = self.load_data()
+            users = data.get("users", [])
 
-        for user in users:
-            if user["id"] == user_id:
+            user = self._find_user(data, user_id)
+            if user is not None:
                 return user
 
-        # If user not found, create a new user and save it
-        new_user = {
-            "id": user_id,
-            "username": None,
-            "joined_at": datetime.now().isoformat(),
-            "current_page": 1,
-            "total_pages": 0,
-            "pdf_path": get_config().pdf_path,
-            "last_sent": None,
-            "total_points": 0,
-            "pages_read": 0,
-            "books_completed": 0,
-            "current_streak": 0,
-            "longest_streak": 0,
-            "last_read_date": None,
-            "achievements": [],
-            "reading_sessions": [],
-            "level": 1,
-            "experience": 0,
-        }
-        users.append(new_user)
-        data["users"] = users
-        self.save_data(data)
-        return new_user
+            # If user not found, create a new user and save it
+            new_user = {
+                "id": user_id,
+                "username": None,
+                "joined_at": datetime.now().isoformat(),
+                "current_page": 1,
+                "total_pages": 0,
+                "pdf_path": get_config().pdf_path,
+                "last_sent": None,
+                "total_points": 0,
+                "pages_read": 0,
+                "books_completed": 0,
+                "current_streak": 0,
+                "longest_streak": 0,
+                "last_read_date": None,
+                "achievements": [],
+                "reading_sessions": [],
+                "level": 1,
+                "experience": 0,
+            }
+            users.append(new_user)
+            data["users"] = users
+            self.save_data(data)
+            return new_user
+
+    def _get_user_field(self, user_id: int, key: str, default: Any = None) -> Any:
+        """read a single field of a user record without copying it (creates the user if missing)"""
+        user = self._find_user(self.load_data(), user_id)
+        if user is None:
+            user = self.get_user_data(user_id)
+        return user.get(key, default)
 
     def get_current_page(self, user_id: int) -> int:
         """Get current page number for a user"""
-        user_data = self.get_user_data(user_id)
-        return user_data.get("current_page", 1)
+        return self._get_user_field(user_id, "current_page", 1)
 
     def set_current_page(self, user_id: int, page: int):
         """Set current page number for a user"""
-        data = self.load_data()
-        users = data.get("users", [])
-
-        for user in users:
-            if user["id"] == user_id:
+        with self._locked():
+            data = self.load_data()
+            user = self._find_user(data, user_id)
+            if user is not None:
                 user["current_page"] = page
                 self.save_data(data)
                 return
 
-        # If user not found, add them with the specified page
-        self.add_user(user_id, None, pdf_path=get_config().pdf_path, current_page=page)
+            # If user not found, add them with the specified page
+            self.add_user(user_id, None, pdf_path=get_config().pdf_path, current_page=page)
 
     def increment_page(self, user_id: int, increment: int = 1) -> int:
         """Increment current page for a user and return new page number"""
-        current = self.get_current_page(user_id)
-        new_page = current + increment
-        self.set_current_page(user_id, new_page)
+        # read-modify-write on the same record under the lock, one save
+        with self._locked():
+            data = self.load_data()
+            user = self._find_user(data, user_id)
+            if user is None:
+                self.set_current_page(user_id, 1 + increment)
+                return 1 + increment
+
+            new_page = user.get("current_page", 1) + increment
+            user["current_page"] = new_page
+            self.save_data(data)
         return new_page
 
     def get_total_pages(self, user_id: int) -> int:
         """Get total pages count for a user's PDF"""
-        user_data = self.get_user_data(user_id)
-        return user_data.get("total_pages", 0)
+        return self._get_user_field(user_id, "total_pages", 0)
 
     def set_total_pages(self, user_id: int, total: int):
         """Set total pages count for a user's PDF"""
-        data = self.load_data()
-        users = data.get("users", [])
-
-        for user in users:
-            if user["id"] == user_id:
+        with self._locked():
+            data = self.load_data()
+            user = self._find_user(data, user_id)
+            if user is not None:
                 user["total_pages"] = total
                 self.save_data(data)
                 return
 
-        # If user not found, add them with the specified total pages
-        self.add_user(user_id, None, pdf_path=get_config().pdf_path, total_pages=total)
+            # If user not found, add them with the specified total pages
+            self.add_user(user_id, None, pdf_path=get_config().pdf_path, total_pages=total)
 
     def add_user(
         self,
@@ -140,12 +436,13 @@ class DatabaseManager:
         total_pages: int = 0,
     ):
         """Add user to database or update existing user"""
-        data = self.load_data()
-        users = data.get("users", [])
+        with self._locked():
+            data = self.load_data()
+            users = data.get("users", [])
 
-        # Check if user already exists
-        for user in users:
-            if user["id"] == user_id:
+            # Check if user already exists
+            user = self._find_user(data, user_id)
+            if user is not None:
                 # Update existing user data if provided
                 if username is not None:
                     user["username"] = username
@@ -156,31 +453,31 @@ class DatabaseManager:
                 self.save_data(data)
                 return
 
-        # Add new user
-        users.append(
-            {
-                "id": user_id,
-                "username": username,
-                "joined_at": datetime.now().isoformat(),
-                "current_page": current_page,
-                "total_pages": total_pages,
-                "pdf_path": pdf_path or get_config().pdf_path,
-                "last_sent": None,
-                "total_points": 0,
-                "pages_read": 0,
-                "books_completed": 0,
-                "current_streak": 0,
-                "longest_streak": 0,
-                "last_read_date": None,
-                "achievements": [],
-                "reading_sessions": [],
-                "level": 1,
-                "experience": 0
-            }
-        )
-
-        data["users"] = users
-        self.save_data(data)
+            # Add new user
+            users.append(
+                {
+                    "id": user_id,
+                    "username": username,
+                    "joined_at": datetime.now().isoformat(),
+                    "current_page": current_page,
+                    "total_pages": total_pages,
+                    "pdf_path": pdf_path or get_config().pdf_path,
+                    "last_sent": None,
+                    "total_points": 0,
+                    "pages_read": 0,
+                    "books_completed": 0,
+                    "current_streak": 0,
+                    "longest_streak": 0,
+                    "last_read_date": None,
+                    "achievements": [],
+                    "reading_sessions": [],
+                    "level": 1,
+                    "experience": 0
+                }
+            )
+
+            data["users"] = users
+            self.save_data(data)
 
     def get_users(self) -> List[Dict[str, Any]]:
         """Get all users"""
@@ -190,50 +487,84 @@ class DatabaseManager:
     def get_user(self, user_id: int) -> Optional[Dict[str, Any]]:
         """Get a specific user by ID, returns None if not found"""
         data = self.load_data()
-        users = data.get("users", [])
-
-        for user in users:
-            if user["id"] == user_id:
-                return user
+        user = self._find_user(data, user_id)
+        if user is not None:
+            return user
 
         return None
     
+    def get_user_state(self, user_id: int) -> UserState:
+        """user existence, book and progress from a single record lookup (never creates the user)"""
+        with self._locked():
+            user = self._find_user(self.load_data(), user_id)
+            if user is None:
+                return UserState(exists=False)
+            return self._state_of(user, _parse_timestamp(user.get("last_sent")))
+
+    def _state_of(self, user: Dict[str, Any], last_sent: Optional[datetime]) -> UserState:
+        """UserState for a record we already have in hand"""
+        pdf_path = user.get("pdf_path", _MISSING)
+        return UserState(
+            exists=True,
+            pdf_path=get_config().pdf_path if pdf_path is _MISSING else pdf_path,
+            current_page=user.get("current_page", 1),
+            total_pages=user.get("total_pages", 0),
+            last_sent=last_sent,
+            user_id=user["id"],
+            username=user.get("username"),
+        )
+
+    def get_scheduled_users(self) -> List[UserState]:
+        """every user with a book, for the scheduler
+
+        one pass over the records instead of get_pdf_path/get_last_sent per user.
+        nobody is filtered by last send: the scheduler needs the next send time
+        of users who aren't due yet too
+        """
+        with self._locked():
+            return [
+                self._state_of(user, _parse_timestamp(user.get("last_sent")))
+                for user in self.load_data().get("users", [])
+                if user.get("pdf_path")
+            ]
+
     # Gamification methods
     def add_points(self, user_id: int, points: int, reason: str = ""):
         """Add points to user and update level"""
-        data = self.load_data()
-        users = data.get("users", [])
-        
-        for user in users:
-            if user["id"] == user_id:
-                user["total_points"] = user.get("total_points", 0) + points
-                user["experience"] = user.get("experience", 0) + points
-                
-                # Calculate level (every 100 points = 1 level)
-                new_level = (user["experience"] // 100) + 1
-                if new_level > user.get("level", 1):
-                    user["level"] = new_level
-                
-                self.save_data(data)
-                return user["total_points"]
-        
-        return 0
+        with self._locked():
+            data = self.load_data()
+            user = self._find_user(data, user_id)
+            if user is None:
+                return 0
+
+            total_points = user.get("total_points", 0) + points
+            experience = user.get("experience", 0) + points
+            user["total_points"] = total_points
+            user["experience"] = experience
+
+            # Calculate level (every 100 points = 1 level)
+            new_level = (experience // 100) + 1
+            if new_level > user.get("level", 1):
+                user["level"] = new_level
+
+            self.save_data(data)
+            return total_points
     
     def mark_page_read(self, user_id: int, pages_count: int = 1):
         """Mark pages as read and award points"""
-        data = self.load_data()
-        users = data.get("users", [])
-        
-        for user in users:
-            if user["id"] == user_id:
+        with self._locked():
+            data = self.load_data()
+            user = self._find_user(data, user_id)
+            if user is not None:
                 user["pages_read"] = user.get("pages_read", 0) + pages_count
                 
                 # Update reading streak
-                today = datetime.now().date().isoformat()
+                today_date = date.today()
+                today = today_date.isoformat()
                 last_read = user.get("last_read_date")
                 
                 if last_read != today:
-                    if last_read == (datetime.now().date() - timedelta(days=1)).isoformat():
+                    if last_read == (today_date - timedelta(days=1)).isoformat():
                         user["current_streak"] = user.get("current_streak", 0) + 1
                     else:
                         user["current_streak"] = 1
@@ -251,84 +582,89 @@ class DatabaseManager:
                 self._check_achievements(user_id)
                 
                 self.save_data(data)
-                break
     
     def complete_book(self, user_id: int):
         """Mark book as completed"""
-        data = self.load_data()
-        users = data.get("users", [])
-        
-        for user in users:
-            if user["id"] == user_id:
+        with self._locked():
+            data = self.load_data()
+            user = self._find_user(data, user_id)
+            if user is not None:
                 user["books_completed"] = user.get("books_completed", 0) + 1
                 self.add_points(user_id, 300, "Completed a book")
                 self._unlock_achievement(user_id, "book_complete")
                 self.save_data(data)
-                break
     
     def _check_achievements(self, user_id: int):
         """Check and unlock achievements for user"""
-        user_data = self.get_user_data(user_id)
-        pages_read = user_data.get("pages_read", 0)
-        current_streak = user_data.get("current_streak", 0)
+        with self._locked():
+            user_data = self.get_user_data(user_id)
+            pages_read = user_data.get("pages_read", 0)
+            current_streak = user_data.get("current_streak", 0)
         
-        # Page-based achievements
-        if pages_read >= 1:
-            self._unlock_achievement(user_id, "first_page")
-        if pages_read >= 10:
-            self._unlock_achievement(user_id, "page_10")
-        if pages_read >= 50:
-            self._unlock_achievement(user_id, "page_50")
-        if pages_read >= 100:
-            self._unlock_achievement(user_id, "page_100")
-        if pages_read >= 500:
-            self._unlock_achievement(user_id, "page_500")
+            # thresholds are sorted, so everything up to the bisect point is reached
+            candidates = list(_PAGE_ACHIEVEMENTS[:bisect_right(_PAGE_THRESHOLDS, pages_read)])
+            candidates.extend(_STREAK_ACHIEVEMENTS[:bisect_right(_STREAK_THRESHOLDS, current_streak)])
         
-        # Streak-based achievements
-        if current_streak >= 7:
-            self._unlock_achievement(user_id, "daily_streak_7")
-        if current_streak >= 30:
-            self._unlock_achievement(user_id, "daily_streak_30")
+            # Time-based achievements
+            if datetime.now().hour >= 22:  # After 10 PM
+                candidates.append("night_owl")
         
-        # Time-based achievements
-        current_hour = datetime.now().hour
-        if current_hour >= 22:  # After 10 PM
-            self._unlock_achievement(user_id, "night_owl")
+            # unlock everything in one pass (one load, one points update, one save)
+            self._unlock_achievements(user_id, candidates)
     
     def _unlock_achievement(self, user_id: int, achievement_id: str):
         """Unlock achievement for user"""
-        data = self.load_data()
-        users = data.get("users", [])
-        achievements = data.get("achievements", [])
+        return bool(self._unlock_achievements(user_id, [achievement_id]))
+    
+    def _unlock_achievements(self, user_id: int, achievement_ids: List[str]) -> List[str]:
+        """unlock several achievements at once, returns ids that were newly unlocked"""
+        with self._locked():
+            if not achievement_ids:
+                return []
         
-        # Find achievement details
-        achievement = next((a for a in achievements if a["id"] == achievement_id), None)
-        if not achievement:
-            return False
+            data = self.load_data()
+            user = self._find_user(data, user_id)
+            if user is None:
+                return []
+        
+            achievements = self._achievements_by_id(data)
+            user_achievements = user.get("achievements", [])
+            owned = set(user_achievements)
+        
+            unlocked = []
+            points = 0
+            for achievement_id in achievement_ids:
+                achievement = achievements.get(achievement_id)
+                if achievement is None or achievement_id in owned:
+                    continue
+                user_achievements.append(achievement_id)
+                owned.add(achievement_id)
+                unlocked.append(achievement_id)
+                points += achievement["points"]
         
-        for user in users:
-            if user["id"] == user_id:
-                user_achievements = user.get("achievements", [])
-                if achievement_id not in user_achievements:
-                    user_achievements.append(achievement_id)
-                    user["achievements"] = user_achievements
-                    self.add_points(user_id, achievement["points"], f"Achievement: {achievement['name']}")
-                    self.save_data(data)
-                    return True
+            if not unlocked:
+                return []
         
-        return False
+            user["achievements"] = user_achievements
+            # add_points saves the data, so this is the only write for the whole batch
+            self.add_points(user_id, points, f"Achievements: {', '.join(unlocked)}")
+            return unlocked
     
     def get_user_stats(self, user_id: int) -> Dict[str, Any]:
         """Get comprehensive user statistics"""
-        user_data = self.get_user_data(user_id)
+        # user record and achievement lookup come from the same loaded data
         data = self.load_data()
-        achievements = data.get("achievements", [])
+        user_data = self._find_user(data, user_id)
+        if user_data is None:
+            user_data = self.get_user_data(user_id)
+            data = self.load_data()
+        achievements = self._achievements_by_id(data)
         
-        user_achievements = []
-        for ach_id in user_data.get("achievements", []):
-            ach = next((a for a in achievements if a["id"] == ach_id), None)
-            if ach:
-                user_achievements.append(ach)
+        user_achievements = [
+            achievements[ach_id] for ach_id in user_data.get("achievements", []) if ach_id in achievements
+        ]
+        level = user_data.get("level", 1)
+        experience = user_data.get("experience", 0)
         
         return {
             "total_points": user_data.get("total_points", 0),
@@ -336,10 +672,10 @@ class DatabaseManager:
             "books_completed": user_data.get("books_completed", 0),
             "current_streak": user_data.get("current_streak", 0),
             "longest_streak": user_data.get("longest_streak", 0),
-            "level": user_data.get("level", 1),
-            "experience": user_data.get("experience", 0),
+            "level": level,
+            "experience": experience,
             "achievements": user_achievements,
-            "next_level_exp": (user_data.get("level", 1) * 100) - user_data.get("experience", 0)
+            "next_level_exp": (level * 100) - experience
         }
     
     def get_leaderboard(self, limit: int = 10) -> List[Dict[str, Any]]:
@@ -347,21 +683,20 @@ class DatabaseManager:
         data = self.load_data()
         users = data.get("users", [])
         
-        # Sort by total points
-        sorted_users = sorted(users, key=lambda x: x.get("total_points", 0), reverse=True)
+        # only the top `limit` users are needed, no need to sort everyone
+        top_users = heapq.nlargest(limit, users, key=lambda x: x.get("total_points", 0))
         
-        leaderboard = []
-        for i, user in enumerate(sorted_users[:limit]):
-            leaderboard.append({
-                "rank": i + 1,
+        return [
+            {
+                "rank": rank,
                 "username": user.get("username", f"User {user['id']}"),
                 "total_points": user.get("total_points", 0),
                 "level": user.get("level", 1),
                 "pages_read": user.get("pages_read", 0),
                 "books_completed": user.get("books_completed", 0)
-            })
-        
-        return leaderboard
+            }
+            for rank, user in enumerate(top_users, 1)
+        ]
     
     def get_available_achievements(self) -> List[Dict[str, Any]]:
         """Get all available achievements"""
@@ -370,65 +705,73 @@ class DatabaseManager:
     
     def add_reading_session(self, user_id: int, pages_read: int, duration_minutes: int):
         """Add a reading session record"""
-        data = self.load_data()
-        sessions = data.get("reading_sessions", [])
-        
-        session = {
-            "user_id": user_id,
-            "pages_read": pages_read,
-            "duration_minutes": duration_minutes,
-            "timestamp": datetime.now().isoformat(),
-            "points_earned": pages_read * 5
-        }
-        
-        sessions.append(session)
-        data["reading_sessions"] = sessions
-        
-        # Check for speed reading achievement
-        if pages_read >= 20:
-            self._unlock_achievement(user_id, "speed_reader")
-        
-        self.save_data(data)
+        self.add_reading_sessions([(user_id, pages_read, duration_minutes)])
+
+    def add_reading_sessions(self, sessions: List[tuple]):
+        """add many (user_id, pages_read, duration_minutes) sessions with a single save"""
+        if not sessions:
+            return
+
+        with self._locked():
+            data = self.load_data()
+            records = data.setdefault("reading_sessions", [])
+            timestamp = datetime.now().isoformat()
+
+            speed_readers = []
+            for user_id, pages_read, duration_minutes in sessions:
+                records.append({
+                    "user_id": user_id,
+                    "pages_read": pages_read,
+                    "duration_minutes": duration_minutes,
+                    "timestamp": timestamp,
+                    "points_earned": pages_read * 5
+                })
+                # Check for speed reading achievement
+                if pages_read >= 20 and user_id not in speed_readers:
+                    speed_readers.append(user_id)
+
+            for user_id in speed_readers:
+                self._unlock_achievements(user_id, ["speed_reader"])
+
+            self.save_data(data)
 
     def set_pdf_path(self, user_id: int, pdf_path: str):
         """Set PDF path for a user"""
-        data = self.load_data()
-        users = data.get("users", [])
-
-        for user in users:
-            if user["id"] == user_id:
+        with self._locked():
+            data = self.load_data()
+            user = self._find_user(data, user_id)
+            if user is not None:
                 user["pdf_path"] = pdf_path
                 self.save_data(data)
                 return
 
-        # If user not found, add them with the specified PDF path
-        self.add_user(user_id, None, pdf_path=pdf_path)
+            # If user not found, add them with the specified PDF path
+            self.add_user(user_id, None, pdf_path=pdf_path)
 
     def get_pdf_path(self, user_id: int) -> str:
         """Get PDF path for a user"""
-        user_data = self.get_user_data(user_id)
-        return user_data.get("pdf_path", get_config().pdf_path)
+        pdf_path = self._get_user_field(user_id, "pdf_path", _MISSING)
+        # only touch the config when the record has no path at all
+        return get_config().pdf_path if pdf_path is _MISSING else pdf_path
 
     def update_last_sent(self, user_id: int):
         """Update last sent timestamp for a user"""
-        data = self.load_data()
-        users = data.get("users", [])
-
-        for user in users:
-            if user["id"] == user_id:
+        with self._locked():
+            data = self.load_data()
+            user = self._find_user(data, user_id)
+            if user is not None:
                 user["last_sent"] = datetime.now().isoformat()
                 self.save_data(data)
                 return
 
     def get_last_sent(self, user_id: int) -> Optional[datetime]:
         """Get last sent timestamp for a user"""
-        user_data = self.get_user_data(user_id)
-        last_sent = user_data.get("last_sent")
+        return _parse_timestamp(self._get_user_field(user_id, "last_sent"))
 
-        if last_sent:
-            try:
-                return datetime.fromisoformat(last_sent)
-            except (ValueError, TypeError):
-                return None
+    def get_page_file_id(self, image_key: str) -> Optional[str]:
+        """telegram file_id of an already uploaded page image, if we have one"""
+        return self._page_file_ids.get(image_key)
 
-        return None
+    def set_page_file_id(self, image_key: str, file_id: str):
+        """remember the file_id telegram gave us for a page image"""
+        self._page_file_ids.update({image_key: file_id})
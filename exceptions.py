@@ -1,16 +1,44 @@
 """Custom exceptions for the PDF Sender Bot."""
 
-from typing import Optional, Any, Dict
+from typing import Optional, Any, Dict, Tuple
+
+_BYTES_PER_MB = 1048576
 
 
 class PDFSenderError(Exception):
-    """Base exception for PDF Sender Bot."""
+    """Base exception for PDF Sender Bot.
+
+    ``details`` is only assembled when someone actually asks for it (logging,
+    formatting), not on every raise - then it's a plain dict like any other.
+    """
+    
+    # typed attributes copied into ``details`` when it's built
+    _detail_fields: Tuple[str, ...] = ()
     
     def __init__(self, message: str, error_code: Optional[str] = None, details: Optional[Dict[str, Any]] = None):
         super().__init__(message)
         self.message = message
         self.error_code = error_code
-        self.details = details or {}
+        self._details_extra = details
+        self._details: Optional[Dict[str, Any]] = None
+    
+    @property
+    def details(self) -> Dict[str, Any]:
+        # built once; later reads return the same dict, so in-place updates stick
+        if self._details is None:
+            details = self._details_extra or {}
+            self._fill_details(details)
+            self._details = details
+        return self._details
+    
+    @details.setter
+    def details(self, value: Optional[Dict[str, Any]]) -> None:
+        self._details = value if value is not None else {}
+    
+    def _fill_details(self, details: Dict[str, Any]) -> None:
+        """add this error's typed fields to ``details``"""
+        for name in self._detail_fields:
+            details[name] = getattr(self, name)
     
     def __str__(self) -> str:
         if self.error_code:
@@ -46,29 +74,31 @@ class FileValidationError(FileError):
 class FileSizeError(FileValidationError):
     """Raised when file size exceeds limits."""
     
+    _detail_fields = ('file_size', 'max_size', 'size_mb', 'max_size_mb')
+    
     def __init__(self, message: str, file_size: int, max_size: int, **kwargs):
         super().__init__(message, **kwargs)
         self.file_size = file_size
         self.max_size = max_size
-        self.details.update({
-            'file_size': file_size,
-            'max_size': max_size,
-            'size_mb': round(file_size / (1024 * 1024), 2),
-            'max_size_mb': round(max_size / (1024 * 1024), 2)
-        })
+    
+    @property
+    def size_mb(self) -> float:
+        return round(self.file_size / _BYTES_PER_MB, 2)
+    
+    @property
+    def max_size_mb(self) -> float:
+        return round(self.max_size / _BYTES_PER_MB, 2)
 
 
 class FileTypeError(FileValidationError):
     """Raised when file type is not allowed."""
     
+    _detail_fields = ('file_type', 'allowed_types')
+    
     def __init__(self, message: str, file_type: str, allowed_types: list, **kwargs):
         super().__init__(message, **kwargs)
         self.file_type = file_type
         self.allowed_types = allowed_types
-        self.details.update({
-            'file_type': file_type,
-            'allowed_types': allowed_types
-        })
 
 
 class PDFError(FileError):
@@ -99,36 +129,33 @@ class UserError(PDFSenderError):
 class UserNotFoundError(UserError):
     """Raised when user is not found in database."""
     
+    _detail_fields = ('user_id',)
+    
     def __init__(self, message: str, user_id: int, **kwargs):
         super().__init__(message, **kwargs)
         self.user_id = user_id
-        self.details.update({'user_id': user_id})
 
 
 class UserPermissionError(UserError):
     """Raised when user lacks required permissions."""
     
+    _detail_fields = ('user_id', 'required_permission')
+    
     def __init__(self, message: str, user_id: int, required_permission: str, **kwargs):
         super().__init__(message, **kwargs)
         self.user_id = user_id
         self.required_permission = required_permission
-        self.details.update({
-            'user_id': user_id,
-            'required_permission': required_permission
-        })
 
 
 class RateLimitError(UserError):
     """Raised when user exceeds rate limits."""
     
+    _detail_fields = ('user_id', 'retry_after')
+    
     def __init__(self, message: str, user_id: int, retry_after: int, **kwargs):
         super().__init__(message, **kwargs)
         self.user_id = user_id
         self.retry_after = retry_after
-        self.details.update({
-            'user_id': user_id,
-            'retry_after': retry_after
-        })
 
 
 class TelegramError(PDFSenderError):
@@ -139,27 +166,23 @@ class TelegramError(PDFSenderError):
 class MessageSendError(TelegramError):
     """Raised when message sending fails."""
     
+    _detail_fields = ('user_id', 'telegram_error')
+    
     def __init__(self, message: str, user_id: int, telegram_error: Optional[str] = None, **kwargs):
         super().__init__(message, **kwargs)
         self.user_id = user_id
         self.telegram_error = telegram_error
-        self.details.update({
-            'user_id': user_id,
-            'telegram_error': telegram_error
-        })
 
 
 class FileSendError(TelegramError):
     """Raised when file sending fails."""
     
+    _detail_fields = ('user_id', 'file_path')
+    
     def __init__(self, message: str, user_id: int, file_path: str, **kwargs):
         super().__init__(message, **kwargs)
         self.user_id = user_id
         self.file_path = file_path
-        self.details.update({
-            'user_id': user_id,
-            'file_path': file_path
-        })
 
 
 class SchedulerError(PDFSenderError):
@@ -170,23 +193,26 @@ class SchedulerError(PDFSenderError):
 class JobError(SchedulerError):
     """Raised when job execution fails."""
     
+    _detail_fields = ('job_id',)
+    
     def __init__(self, message: str, job_id: str, **kwargs):
         super().__init__(message, **kwargs)
         self.job_id = job_id
-        self.details.update({'job_id': job_id})
 
 
 class ValidationError(PDFSenderError):
     """Raised when data validation fails."""
     
+    _detail_fields = ('field',)
+    
     def __init__(self, message: str, field: str, value: Any, **kwargs):
         super().__init__(message, **kwargs)
         self.field = field
         self.value = value
-        self.details.update({
-            'field': field,
-            'value': str(value)
-        })
+    
+    def _fill_details(self, details: Dict[str, Any]) -> None:
+        super()._fill_details(details)
+        details['value'] = str(self.value)
 
 
 class NetworkError(PDFSenderError):
@@ -197,10 +223,11 @@ class NetworkError(PDFSenderError):
 class TimeoutError(NetworkError):
     """Raised when operations timeout."""
     
+    _detail_fields = ('timeout_seconds',)
+    
     def __init__(self, message: str, timeout_seconds: int, **kwargs):
         super().__init__(message, **kwargs)
         self.timeout_seconds = timeout_seconds
-        self.details.update({'timeout_seconds': timeout_seconds})
 
 
 class ResourceError(PDFSenderError):
@@ -211,16 +238,20 @@ class ResourceError(PDFSenderError):
 class DiskSpaceError(ResourceError):
     """Raised when disk space is insufficient."""
     
+    _detail_fields = ('available_space', 'required_space', 'available_mb', 'required_mb')
+    
     def __init__(self, message: str, available_space: int, required_space: int, **kwargs):
         super().__init__(message, **kwargs)
         self.available_space = available_space
         self.required_space = required_space
-        self.details.update({
-            'available_space': available_space,
-            'required_space': required_space,
-            'available_mb': round(available_space / (1024 * 1024), 2),
-            'required_mb': round(required_space / (1024 * 1024), 2)
-        })
+    
+    @property
+    def available_mb(self) -> float:
+        return round(self.available_space / _BYTES_PER_MB, 2)
+    
+    @property
+    def required_mb(self) -> float:
+        return round(self.required_space / _BYTES_PER_MB, 2)
 
 
 class MemoryError(ResourceError):
@@ -257,10 +288,13 @@ ERROR_CODES = {
 }
 
 
+class _SafeDict(dict):
+    """Format mapping that leaves unknown placeholders as they are."""
+
+    def __missing__(self, key: str) -> str:
+        return '{' + key + '}'
+
+
 def get_error_message(error_code: str, **kwargs) -> str:
     """Get formatted error message for error code."""
-    template = ERROR_CODES.get(error_code, 'Unknown error')
-    try:
-        return template.format(**kwargs)
-    except KeyError:
-        return template
\ No newline at end of file
+    return ERROR_CODES.get(error_code, 'Unknown error').format_map(_SafeDict(kwargs))
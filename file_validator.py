@@ -3,24 +3,126 @@ File validation utilities for PDF uploads
 """
 
 import logging
-import mimetypes
 import os
+import re
+from contextlib import closing
+from functools import lru_cache
 from typing import Optional, Tuple
 
-import fitz as pymupdf
-
 from config import get_config, Config
 
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=None)
+def _pymupdf():
+    """MuPDF bindings, imported on first use - the native library is heavy and
+    processes that only sanitize names never need it"""
+    import fitz
+
+    return fitz
+
+
+# every PDF starts with this marker (readers accept it anywhere in the first 1KB)
+PDF_MAGIC = b"%PDF-"
+PDF_HEADER_SCAN = 1024
+# ...and ends with "startxref <offset> %%EOF" within the last 1KB
+PDF_EOF = b"%%EOF"
+PDF_STARTXREF = b"startxref"
+PDF_TRAILER_SCAN = 1024
+
+# validation results; callers can compare against these directly
+VALID_PDF = (True, "Valid PDF file")
+ERR_NOT_FOUND = (False, "File not found")
+ERR_INVALID_TYPE = (False, "Invalid file type. Only PDF files are supported")
+ERR_CORRUPTED = (False, "Invalid or corrupted PDF file")
+ERR_EMPTY = (False, "PDF file is empty or corrupted")
+ERR_PASSWORD = (False, "Password-protected PDFs are not supported")
+ERR_TOO_MANY_PAGES = (False, "PDF has too many pages (maximum: 10,000)")
+ERR_UNREADABLE = (False, "PDF file appears to be corrupted or unreadable")
+ERR_VALIDATION = (False, "Error validating file")
+ERR_TOO_LARGE_TMPL = "File too large. Maximum size: {}MB"
+
+
+@lru_cache(maxsize=None)
+def _too_large(max_size_bytes: int) -> Tuple[bool, str]:
+    """size-limit rejection, formatted once per limit"""
+    return False, ERR_TOO_LARGE_TMPL.format(max_size_bytes // (1024 * 1024))
+
+
+# anything but letters/digits (unicode too, like str.isalnum) and "._-"
+_UNSAFE_FILENAME_CHARS = re.compile(r"[^\w.-]+")
+
+
+@lru_cache(maxsize=512)
+def _validate_pdf_content(file_path: str, mtime_ns: int, size: int) -> Tuple[bool, str]:
+    """
+    Check the PDF content itself (trailer, MuPDF open, page checks).
+
+    The caller has already sniffed the magic header. Cached on
+    (path, mtime, size) so re-validating an unchanged file skips MuPDF
+    entirely; any change to the file produces a new key.
+    """
+    with open(file_path, "rb") as f:
+        # Cheap structural reject: a complete PDF ends with startxref + %%EOF.
+        # Truncated uploads fail here without MuPDF parsing anything
+        f.seek(max(size - PDF_TRAILER_SCAN, 0))
+        trailer = f.read()
+        if PDF_EOF not in trailer or PDF_STARTXREF not in trailer:
+            return ERR_CORRUPTED
+
+    # Try to open and validate PDF content; closing() releases the MuPDF
+    # handle on every path, including exceptions. opened by path, so mupdf
+    # reads only the objects it needs instead of the whole upload in memory
+    try:
+        with closing(_pymupdf().open(file_path, filetype="pdf")) as doc:
+            page_count = doc.page_count
+
+            # Check if PDF has pages
+            if page_count == 0:
+                return ERR_EMPTY
+
+            # Check if PDF is encrypted
+            if doc.needs_pass:
+                return ERR_PASSWORD
+
+            # Check page count limit (reasonable upper bound)
+            if page_count > 10000:
+                return ERR_TOO_MANY_PAGES
+
+            # Parse the first page's content stream to make sure the PDF is
+            # readable - text extraction does that without rasterizing
+            try:
+                doc[0].get_text("text")
+            except Exception as e:
+                logger.warning(f"PDF validation failed during page extraction: {e}")
+                return ERR_UNREADABLE
+
+        logger.info(
+            f"PDF validation successful: {page_count} pages, {size} bytes"
+        )
+        return VALID_PDF
+
+    except Exception as e:
+        logger.error(f"Error validating PDF content: {e}")
+        return ERR_CORRUPTED
+
 
 class FileValidator:
     """Validates uploaded files for security and compatibility"""
     
+    _instance: Optional["FileValidator"] = None
+    
     def __init__(self, config: Optional[Config] = None):
         """Initialize FileValidator with config"""
         self.config = config or get_config()
 
+    @classmethod
+    def default(cls) -> "FileValidator":
+        """Shared validator bound to the global config (created on first use)"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
     def validate_pdf_file(
         self, file_path: str, file_size: Optional[int] = None
     ) -> Tuple[bool, str]:
@@ -35,70 +137,38 @@ class FileValidator:
             Tuple of (is_valid, error_message)
         """
         try:
-            # Check if file exists
-            if not os.path.exists(file_path):
-                return False, "File not found"
-
-            # Get file size if not provided
+            try:
+                f = open(file_path, "rb")
+            except FileNotFoundError:
+                return ERR_NOT_FOUND
+
+            with f:
+                # Sniff the magic header first: wrong uploads are rejected after
+                # one small read, before any size check or MuPDF work
+                header = f.read(PDF_HEADER_SCAN)
+                if PDF_MAGIC not in header:
+                    if file_path[-4:].lower() != ".pdf":
+                        return ERR_INVALID_TYPE
+                    return ERR_CORRUPTED
+
+                # fstat on the open handle gives size and mtime without a path lookup
+                st = os.fstat(f.fileno())
+
+            # Use the on-disk size if not provided
             if file_size is None:
-                file_size = os.path.getsize(file_path)
+                file_size = st.st_size
 
             # Check file size limit
             max_size_bytes = self.config.max_file_size
             if file_size > max_size_bytes:
-                max_size_mb = max_size_bytes // (1024 * 1024)
-                return (
-                    False,
-                    f"File too large. Maximum size: {max_size_mb}MB",
-                )
-
-            # Check MIME type
-            mime_type, _ = mimetypes.guess_type(file_path)
-            if mime_type != "application/pdf":
-                return False, "Invalid file type. Only PDF files are supported"
-
-            # Try to open and validate PDF content
-            try:
-                doc = pymupdf.open(file_path)
-                page_count = len(doc)
-
-                # Check if PDF has pages
-                if page_count == 0:
-                    doc.close()
-                    return False, "PDF file is empty or corrupted"
-
-                # Check if PDF is encrypted
-                if doc.needs_pass:
-                    doc.close()
-                    return False, "Password-protected PDFs are not supported"
-
-                # Check page count limit (reasonable upper bound)
-                if page_count > 10000:
-                    doc.close()
-                    return False, "PDF has too many pages (maximum: 10,000)"
-
-                # Try to extract a page to ensure PDF is readable
-                try:
-                    page = doc[0]
-                    _ = page.get_pixmap()
-                except Exception as e:
-                    doc.close()
-                    logger.warning(f"PDF validation failed during page extraction: {e}")
-                    return False, "PDF file appears to be corrupted or unreadable"
-
-                doc.close()
-                logger.info(
-                    f"PDF validation successful: {page_count} pages, {file_size} bytes"
-                )
-                return True, "Valid PDF file"
+                return _too_large(max_size_bytes)
 
-            except Exception as e:
-                logger.error(f"Error validating PDF content: {e}")
-                return False, "Invalid or corrupted PDF file"
+            # Content checks are cached per (path, mtime, size)
+            return _validate_pdf_content(file_path, st.st_mtime_ns, st.st_size)
 
         except Exception as e:
             logger.error(f"Error during file validation: {e}")
-            return False, "Error validating file"
+            return ERR_VALIDATION
 
     def validate_file_name(self, filename: str) -> Tuple[bool, str]:
         """
@@ -115,10 +185,10 @@ class FileValidator:
 
         # Remove path separators and other dangerous characters
         sanitized = os.path.basename(filename)
-        sanitized = "".join(c for c in sanitized if c.isalnum() or c in "._-")
+        sanitized = _UNSAFE_FILENAME_CHARS.sub("", sanitized)
 
         # Ensure it ends with .pdf
-        if not sanitized.lower().endswith(".pdf"):
+        if sanitized[-4:].lower() != ".pdf":
             sanitized += ".pdf"
 
         # Ensure it's not empty after sanitization
@@ -1,538 +1,564 @@
+import sys
+from functools import lru_cache
+
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
-from aiogram.utils.keyboard import InlineKeyboardBuilder
-from typing import Dict, Any
+from typing import Callable, Dict, Any, List, Sequence, Tuple, Union
+
+
+def _button(text: str, callback_data: str) -> InlineKeyboardButton:
+    """inline button without pydantic validation (all our fields are plain str)
+
+    callback_data is interned: the same few values ("main_menu", "settings_menu",
+    formatted "st_06:00"...) repeat across many markups
+    """
+    return InlineKeyboardButton.model_construct(text=text, callback_data=sys.intern(callback_data))
+
+
+def _markup(rows: List[List[InlineKeyboardButton]]) -> InlineKeyboardMarkup:
+    """inline markup from ready rows, again skipping validation"""
+    return InlineKeyboardMarkup.model_construct(inline_keyboard=rows)
+
+
+def _rows(rows: Sequence[Sequence[Union[Tuple[str, str], InlineKeyboardButton]]]) -> InlineKeyboardMarkup:
+    """markup from rows of (text, callback_data) pairs or shared buttons, built in one pass"""
+    return _markup([
+        [item if isinstance(item, InlineKeyboardButton) else _button(*item) for item in row]
+        for row in rows
+    ])
+
+
+# back buttons repeat across most menus; one instance of each is shared
+_BACK_MAIN = _button("🔙 Back to Menu", "main_menu")
+_BACK_MAIN_SHORT = _button("🔙 Back", "main_menu")
+_BACK_MAIN_RU = _button("🔙 Главное меню", "main_menu")
+_BACK_SETTINGS = _button("🔙 Back to settings", "settings_menu")
+_BACK_SETTINGS_RU = _button("🔙 Назад к настройкам", "settings_menu")
+_BACK_ADMIN = _button("🔙 Админ панель", "admin_menu")
+
+
+# short callback_data prefixes for the numbered choices: Telegram caps
+# callback_data at 64 bytes and every byte is resent with each markup.
+# handlers still accept the long forms carried by buttons in older messages
+CB_PAGES_PER_SEND = "pps_"
+CB_SCHEDULE_TIME = "st_"
+CB_INTERVAL_HOURS = "ih_"
+CB_IMAGE_QUALITY = "iq_"
+CB_GOTO_PAGE = "gp_"
+
+
+# Popular times for schedule_time_menu, laid out 3 per row
+_SCHEDULE_TIMES: Tuple[Tuple[str, str], ...] = (
+    ("🌅 06:00", "06:00"), ("🌄 07:00", "07:00"), ("☀️ 08:00", "08:00"),
+    ("🌞 09:00", "09:00"), ("🕙 10:00", "10:00"), ("🕚 11:00", "11:00"),
+    ("🕛 12:00", "12:00"), ("🕐 13:00", "13:00"), ("🕑 14:00", "14:00"),
+    ("🕒 15:00", "15:00"), ("🕓 16:00", "16:00"), ("🕔 17:00", "17:00"),
+    ("🕕 18:00", "18:00"), ("🕖 19:00", "19:00"), ("🕗 20:00", "20:00"),
+    ("🕘 21:00", "21:00"), ("🕙 22:00", "22:00"), ("🕚 23:00", "23:00")
+)
+
+_INTERVALS: Tuple[Tuple[str, int], ...] = (
+    ("1 hour", 1), ("2 hours", 2), ("3 hours", 3),
+    ("4 hours", 4), ("6 hours", 6), ("8 hours", 8),
+    ("12 hours", 12), ("24 hours", 24)
+)
+
+_QUALITIES: Tuple[Tuple[str, int], ...] = (
+    ("🔴 Low (50%)", 50),
+    ("🟡 Medium (70%)", 70),
+    ("🟢 Good (85%)", 85),
+    ("🔵 High (95%)", 95),
+    ("⭐ Maximum (100%)", 100)
+)
+
+# the settings choice menus never change, so they are built once at import:
+# each button exists once in a tuple and the rows are plain slices of it
+
+# Buttons with numbers from 1 to 10, 5 per row
+_PAGES_PER_SEND_BUTTONS: Tuple[InlineKeyboardButton, ...] = tuple(
+    _button(str(i), f"{CB_PAGES_PER_SEND}{i}") for i in range(1, 11)
+)
+PAGES_PER_SEND_MENU = _markup([
+    list(_PAGES_PER_SEND_BUTTONS[0:5]),
+    list(_PAGES_PER_SEND_BUTTONS[5:10]),
+    [_BACK_SETTINGS],
+])
+
+_SCHEDULE_BUTTONS: Tuple[InlineKeyboardButton, ...] = tuple(
+    _button(text, f"{CB_SCHEDULE_TIME}{time_val}") for text, time_val in _SCHEDULE_TIMES
+)
+SCHEDULE_TIME_MENU = _markup(
+    [list(_SCHEDULE_BUTTONS[i:i + 3]) for i in range(0, len(_SCHEDULE_BUTTONS), 3)]
+    + [
+        [_button("✏️ Enter custom time", "custom_schedule_time")],
+        [_BACK_SETTINGS],
+    ]
+)
+
+_INTERVAL_BUTTONS: Tuple[InlineKeyboardButton, ...] = tuple(
+    _button(text, f"{CB_INTERVAL_HOURS}{hours}") for text, hours in _INTERVALS
+)
+INTERVAL_HOURS_MENU = _markup(
+    [list(_INTERVAL_BUTTONS[i:i + 2]) for i in range(0, len(_INTERVAL_BUTTONS), 2)]
+    + [[_BACK_SETTINGS]]
+)
+
+_QUALITY_BUTTONS: Tuple[InlineKeyboardButton, ...] = tuple(
+    _button(text, f"{CB_IMAGE_QUALITY}{quality}") for text, quality in _QUALITIES
+)
+IMAGE_QUALITY_MENU = _markup(
+    [[button] for button in _QUALITY_BUTTONS]
+    + [[_BACK_SETTINGS]]
+)
+
+
+# Main bot menu
+MAIN_MENU = _rows([
+    [
+        ("📄 Next pages", "next_pages"),
+        ("📍 Current page", "current_page")
+    ],
+    [
+        ("🔍 Go to page", "goto_page"),
+        ("📊 Statistics", "stats")
+    ],
+    [
+        ("🏆 Leaderboard", "leaderboard"),
+        ("🎯 Achievements", "achievements")
+    ],
+    [
+        ("⚙️ Settings", "settings_menu"),
+        ("📚 Manage books", "books_menu")
+    ],
+    [
+        ("ℹ️ Help", "help"),
+        ("🔧 Admin panel", "admin_menu")
+    ],
+])
+
+# Reading progress menu with 'I Read' button (progress itself is shown in the
+# message text, so the buttons are the same for every page)
+READING_PROGRESS_MENU = _rows([
+    [("✅ I Read This Page (+5 pts)", "mark_page_read")],
+    [
+        ("📄 Next Page", "next_pages"),
+        ("📊 My Stats", "my_stats")
+    ],
+    [_BACK_MAIN],
+])
+
+# Leaderboard menu
+LEADERBOARD_MENU = _rows([
+    [
+        ("🏆 Top Points", "leaderboard_points"),
+        ("📚 Most Pages", "leaderboard_pages")
+    ],
+    [
+        ("🔥 Longest Streak", "leaderboard_streak"),
+        ("📖 Books Completed", "leaderboard_books")
+    ],
+    [("🔄 Refresh", "leaderboard")],
+    [_BACK_MAIN],
+])
+
+# Achievements menu
+ACHIEVEMENTS_MENU = _rows([
+    [
+        ("🎯 My Achievements", "my_achievements"),
+        ("📋 All Achievements", "all_achievements")
+    ],
+    [("🏅 Recent Unlocks", "recent_achievements")],
+    [_BACK_MAIN],
+])
+
+# Enhanced statistics menu
+STATS_MENU = _rows([
+    [
+        ("📊 Reading Stats", "reading_stats"),
+        ("🎮 Game Stats", "game_stats")
+    ],
+    [
+        ("📈 Progress Chart", "progress_chart"),
+        ("🏆 Achievements", "achievements")
+    ],
+    [_BACK_MAIN],
+])
+
+# Settings menu
+SETTINGS_MENU = _rows([
+    [
+        ("📄 Pages per send", "set_pages_per_send"),
+        ("⏰ Send time", "set_schedule_time")
+    ],
+    [
+        ("🔄 Send interval", "set_interval_hours"),
+        ("🖼️ Image quality", "set_image_quality")
+    ],
+    [
+        ("🤖 Auto-send", "toggle_auto_send"),
+        ("🔔 Notifications", "toggle_notifications")
+    ],
+    [("📋 Show settings", "show_settings")],
+    [_BACK_MAIN_SHORT],
+])
+
+# Book management menu
+BOOKS_MENU = _rows([
+    [
+        ("📤 Upload book", "upload_book"),
+        ("📚 Book list", "list_books")
+    ],
+    [
+        ("🔄 Change book", "change_book"),
+        ("📊 Reading progress", "reading_progress")
+    ],
+    [_BACK_MAIN_SHORT],
+])
+
+# Меню администратора
+ADMIN_MENU = _rows([
+    [
+        ("👥 Пользователи", "admin_users"),
+        ("🖥️ Система", "admin_system")
+    ],
+    [
+        ("📝 Логи", "admin_logs"),
+        ("📦 Backup", "admin_backup")
+    ],
+    [
+        ("🧹 Очистка", "admin_cleanup"),
+        ("⚙️ Настройки", "admin_settings")
+    ],
+    [_BACK_MAIN_RU],
+])
+
+# Меню управления пользователями
+USERS_MANAGEMENT_MENU = _rows([
+    [
+        ("📊 Статистика", "users_stats"),
+        ("👤 Список", "users_list")
+    ],
+    [
+        ("🔍 Поиск", "users_search"),
+        ("📈 Активность", "users_activity")
+    ],
+    [
+        ("🚫 Заблокированные", "users_blocked"),
+        ("⚙️ Настройки", "users_settings")
+    ],
+    [_BACK_ADMIN],
+])
+
+# Меню статуса чтения
+STATUS_MENU = _rows([
+    [
+        ("📄 Следующие страницы", "next_pages"),
+        ("🔄 Обновить статус", "status")
+    ],
+    [_BACK_MAIN_RU],
+])
+
+# Меню системы
+SYSTEM_MENU = _rows([
+    [
+        ("🔄 Обновить", "system_refresh"),
+        ("📊 Мониторинг", "system_monitoring")
+    ],
+    [
+        ("🗂️ Хранилище", "system_storage"),
+        ("⚡ Производительность", "system_performance")
+    ],
+    [
+        ("🔧 Конфигурация", "system_config"),
+        ("🔄 Перезапуск", "system_restart")
+    ],
+    [_BACK_ADMIN],
+])
+
+# Меню логов
+LOGS_MENU = _rows([
+    [
+        ("🔄 Обновить", "logs_refresh"),
+        ("📄 Полные логи", "logs_full")
+    ],
+    [
+        ("🔴 Ошибки", "logs_errors"),
+        ("🟡 Предупреждения", "logs_warnings")
+    ],
+    [
+        ("📊 Статистика", "logs_stats"),
+        ("🗑️ Очистить", "logs_clear")
+    ],
+    [_BACK_ADMIN],
+])
+
+# Меню резервного копирования
+BACKUP_MENU = _rows([
+    [
+        ("📦 Создать backup", "backup_create"),
+        ("📋 Список backup'ов", "backup_list")
+    ],
+    [
+        ("📥 Восстановить", "backup_restore"),
+        ("🗑️ Удалить старые", "backup_cleanup")
+    ],
+    [
+        ("⚙️ Настройки", "backup_settings"),
+        ("📊 Статистика", "backup_stats")
+    ],
+    [_BACK_ADMIN],
+])
+
+# Меню очистки
+CLEANUP_MENU = _rows([
+    [
+        ("🧹 Запустить очистку", "cleanup_run"),
+        ("📊 Статистика", "cleanup_stats")
+    ],
+    [
+        ("🖼️ Изображения", "cleanup_images"),
+        ("📁 Загрузки", "cleanup_uploads")
+    ],
+    [
+        ("🗑️ Логи", "cleanup_logs"),
+        ("⚙️ Настройки", "cleanup_settings")
+    ],
+    [_BACK_ADMIN],
+])
+
+# Level up celebration menu (same buttons for every level, so no per-level cache)
+LEVEL_UP_MENU = _rows([
+    [("🎉 Awesome!", "main_menu")],
+    [
+        ("📊 View Stats", "my_stats"),
+        ("🏆 Leaderboard", "leaderboard")
+    ],
+])
+
+# Achievement unlocked menu (the name only goes into the message text)
+ACHIEVEMENT_UNLOCKED_MENU = _rows([
+    [("🎯 View All Achievements", "my_achievements")],
+    [
+        ("📊 My Stats", "my_stats"),
+        ("🏆 Leaderboard", "leaderboard")
+    ],
+    [("🔙 Continue Reading", "main_menu")],
+])
+
+# Простая навигационная клавиатура
+PAGE_NAVIGATION_MENU = _rows([
+    [("🏠 Главное меню", "main_menu")],
+])
+
+
+# Кнопки навигации: first/prev appear past page 1, next/last before the end, so
+# only four layouts exist, keyed on (current_page > 1, current_page < total_pages).
+# each template returns its rows already split 2 or 3 per row
+
+
+def _nav_info(current_page: int, total_pages: int) -> InlineKeyboardButton:
+    return _button(f"📄 {current_page}/{total_pages}", "current_page_info")
+
+
+# the same page number shows up as "next" on one page, "prev" on another and
+# "last" on all of them, so its callback string is formatted once (_button interns it)
+@lru_cache(maxsize=2048)
+def _goto_cb(page: int) -> str:
+    return f"{CB_GOTO_PAGE}{page}"
+
+
+_FIRST_PAGE_BUTTON = _button("⏮️ Первая", _goto_cb(1))
+
+
+def _nav_prev(current_page: int) -> InlineKeyboardButton:
+    return _button("◀️ Назад", _goto_cb(current_page - 1))
+
+
+def _nav_next(current_page: int) -> InlineKeyboardButton:
+    return _button("▶️ Вперед", _goto_cb(current_page + 1))
+
+
+def _nav_last(total_pages: int) -> InlineKeyboardButton:
+    return _button("⏭️ Последняя", _goto_cb(total_pages))
+
+
+_NAV_TEMPLATES: Dict[Tuple[bool, bool], Callable[[int, int], List[List[InlineKeyboardButton]]]] = {
+    # single page
+    (False, False): lambda cur, total: [[_nav_info(cur, total)]],
+    # last page
+    (True, False): lambda cur, total: [
+        [_FIRST_PAGE_BUTTON, _nav_prev(cur)],
+        [_nav_info(cur, total)],
+    ],
+    # first page
+    (False, True): lambda cur, total: [
+        [_nav_info(cur, total), _nav_next(cur)],
+        [_nav_last(total)],
+    ],
+    # somewhere in the middle
+    (True, True): lambda cur, total: [
+        [_FIRST_PAGE_BUTTON, _nav_prev(cur), _nav_info(cur, total)],
+        [_nav_next(cur), _nav_last(total)],
+    ],
+}
+
+# Дополнительные действия
+_NAV_FOOTER_ROWS: Tuple[List[InlineKeyboardButton], ...] = (
+    [
+        _button("🔍 Перейти к странице", "goto_page"),
+        _button("📄 Следующие страницы", "next_pages")
+    ],
+    [_BACK_MAIN_RU],
+)
+
+
+# a reader pages through the same book, so (current_page, total_pages) pairs
+# repeat a lot; the markup is a pure function of the pair so entries never go stale
+@lru_cache(maxsize=8192)
+def _navigation_menu(current_page: int, total_pages: int) -> InlineKeyboardMarkup:
+    """Page navigation menu"""
+    rows = _NAV_TEMPLATES[(current_page > 1, current_page < total_pages)](current_page, total_pages)
+    rows.extend(_NAV_FOOTER_ROWS)
+    return _markup(rows)
 
 
 class BotKeyboards:
-    """Class for creating inline bot keyboards"""
-    
+    """Class for creating inline bot keyboards
+
+    markups are immutable and depend only on the arguments: the fixed menus are
+    public module constants (MAIN_MENU, SETTINGS_MENU, ...) that new code can
+    import directly, the static methods stay for existing callers; the
+    parameterized factories are cached per call
+    """
+
     @staticmethod
     def main_menu() -> InlineKeyboardMarkup:
         """Main bot menu"""
-        builder = InlineKeyboardBuilder()
-        
-        builder.row(
-            InlineKeyboardButton(text="📄 Next pages", callback_data="next_pages"),
-            InlineKeyboardButton(text="📍 Current page", callback_data="current_page")
-        )
-        builder.row(
-            InlineKeyboardButton(text="🔍 Go to page", callback_data="goto_page"),
-            InlineKeyboardButton(text="📊 Statistics", callback_data="stats")
-        )
-        builder.row(
-            InlineKeyboardButton(text="🏆 Leaderboard", callback_data="leaderboard"),
-            InlineKeyboardButton(text="🎯 Achievements", callback_data="achievements")
-        )
-        builder.row(
-            InlineKeyboardButton(text="⚙️ Settings", callback_data="settings_menu"),
-            InlineKeyboardButton(text="📚 Manage books", callback_data="books_menu")
-        )
-        builder.row(
-            InlineKeyboardButton(text="ℹ️ Help", callback_data="help"),
-            InlineKeyboardButton(text="🔧 Admin panel", callback_data="admin_menu")
-        )
-        
-        return builder.as_markup()
-    
+        return MAIN_MENU
+
     @staticmethod
     def reading_progress_menu(current_page: int, total_pages: int) -> InlineKeyboardMarkup:
         """Reading progress menu with 'I Read' button"""
-        builder = InlineKeyboardBuilder()
-        
-        # Progress bar
-        progress = (current_page / total_pages) * 100 if total_pages > 0 else 0
-        progress_bar = "█" * int(progress / 10) + "░" * (10 - int(progress / 10))
-        
-        builder.row(
-            InlineKeyboardButton(
-                text=f"✅ I Read This Page (+5 pts)", 
-                callback_data="mark_page_read"
-            )
-        )
-        builder.row(
-            InlineKeyboardButton(text="📄 Next Page", callback_data="next_pages"),
-            InlineKeyboardButton(text="📊 My Stats", callback_data="my_stats")
-        )
-        builder.row(
-            InlineKeyboardButton(text="🔙 Back to Menu", callback_data="main_menu")
-        )
-        
-        return builder.as_markup()
-    
+        return READING_PROGRESS_MENU
+
     @staticmethod
     def leaderboard_menu() -> InlineKeyboardMarkup:
         """Leaderboard menu"""
-        builder = InlineKeyboardBuilder()
-        
-        builder.row(
-            InlineKeyboardButton(text="🏆 Top Points", callback_data="leaderboard_points"),
-            InlineKeyboardButton(text="📚 Most Pages", callback_data="leaderboard_pages")
-        )
-        builder.row(
-            InlineKeyboardButton(text="🔥 Longest Streak", callback_data="leaderboard_streak"),
-            InlineKeyboardButton(text="📖 Books Completed", callback_data="leaderboard_books")
-        )
-        builder.row(
-            InlineKeyboardButton(text="🔄 Refresh", callback_data="leaderboard")
-        )
-        builder.row(
-            InlineKeyboardButton(text="🔙 Back to Menu", callback_data="main_menu")
-        )
-        
-        return builder.as_markup()
-    
+        return LEADERBOARD_MENU
+
     @staticmethod
     def achievements_menu() -> InlineKeyboardMarkup:
         """Achievements menu"""
-        builder = InlineKeyboardBuilder()
-        
-        builder.row(
-            InlineKeyboardButton(text="🎯 My Achievements", callback_data="my_achievements"),
-            InlineKeyboardButton(text="📋 All Achievements", callback_data="all_achievements")
-        )
-        builder.row(
-            InlineKeyboardButton(text="🏅 Recent Unlocks", callback_data="recent_achievements")
-        )
-        builder.row(
-            InlineKeyboardButton(text="🔙 Back to Menu", callback_data="main_menu")
-        )
-        
-        return builder.as_markup()
-    
+        return ACHIEVEMENTS_MENU
+
     @staticmethod
     def stats_menu() -> InlineKeyboardMarkup:
         """Enhanced statistics menu"""
-        builder = InlineKeyboardBuilder()
-        
-        builder.row(
-            InlineKeyboardButton(text="📊 Reading Stats", callback_data="reading_stats"),
-            InlineKeyboardButton(text="🎮 Game Stats", callback_data="game_stats")
-        )
-        builder.row(
-            InlineKeyboardButton(text="📈 Progress Chart", callback_data="progress_chart"),
-            InlineKeyboardButton(text="🏆 Achievements", callback_data="achievements")
-        )
-        builder.row(
-            InlineKeyboardButton(text="🔙 Back to Menu", callback_data="main_menu")
-        )
-        
-        return builder.as_markup()
-    
+        return STATS_MENU
+
     @staticmethod
     def level_up_menu(new_level: int) -> InlineKeyboardMarkup:
         """Level up celebration menu"""
-        builder = InlineKeyboardBuilder()
-        
-        builder.row(
-            InlineKeyboardButton(text="🎉 Awesome!", callback_data="main_menu")
-        )
-        builder.row(
-            InlineKeyboardButton(text="📊 View Stats", callback_data="my_stats"),
-            InlineKeyboardButton(text="🏆 Leaderboard", callback_data="leaderboard")
-        )
-        
-        return builder.as_markup()
-    
+        return LEVEL_UP_MENU
+
     @staticmethod
     def achievement_unlocked_menu(achievement_name: str) -> InlineKeyboardMarkup:
         """Achievement unlocked menu"""
-        builder = InlineKeyboardBuilder()
-        
-        builder.row(
-            InlineKeyboardButton(text="🎯 View All Achievements", callback_data="my_achievements")
-        )
-        builder.row(
-            InlineKeyboardButton(text="📊 My Stats", callback_data="my_stats"),
-            InlineKeyboardButton(text="🏆 Leaderboard", callback_data="leaderboard")
-        )
-        builder.row(
-            InlineKeyboardButton(text="🔙 Continue Reading", callback_data="main_menu")
-        )
-        
-        return builder.as_markup()
-    
+        return ACHIEVEMENT_UNLOCKED_MENU
+
     @staticmethod
     def settings_menu() -> InlineKeyboardMarkup:
         """Settings menu"""
-        builder = InlineKeyboardBuilder()
-        
-        builder.row(
-            InlineKeyboardButton(text="📄 Pages per send", callback_data="set_pages_per_send"),
-            InlineKeyboardButton(text="⏰ Send time", callback_data="set_schedule_time")
-        )
-        builder.row(
-            InlineKeyboardButton(text="🔄 Send interval", callback_data="set_interval_hours"),
-            InlineKeyboardButton(text="🖼️ Image quality", callback_data="set_image_quality")
-        )
-        builder.row(
-            InlineKeyboardButton(text="🤖 Auto-send", callback_data="toggle_auto_send"),
-            InlineKeyboardButton(text="🔔 Notifications", callback_data="toggle_notifications")
-        )
-        builder.row(
-            InlineKeyboardButton(text="📋 Show settings", callback_data="show_settings")
-        )
-        builder.row(
-            InlineKeyboardButton(text="🔙 Back", callback_data="main_menu")
-        )
-        
-        return builder.as_markup()
-    
+        return SETTINGS_MENU
+
     @staticmethod
     def pages_per_send_menu() -> InlineKeyboardMarkup:
         """Menu for selecting the number of pages"""
-        builder = InlineKeyboardBuilder()
-        
-        # Buttons with numbers from 1 to 10
-        for i in range(1, 11):
-            builder.add(InlineKeyboardButton(
-                text=str(i), 
-                callback_data=f"pages_per_send_{i}"
-            ))
-        
-        # Arrange 5 buttons per row
-        builder.adjust(5, 5)
-        
-        builder.row(
-            InlineKeyboardButton(text="🔙 Back to settings", callback_data="settings_menu")
-        )
-        
-        return builder.as_markup()
-    
+        return PAGES_PER_SEND_MENU
+
     @staticmethod
     def schedule_time_menu() -> InlineKeyboardMarkup:
         """Menu for selecting send time"""
-        builder = InlineKeyboardBuilder()
-        
-        # Popular times
-        times = [
-            ("🌅 06:00", "06:00"), ("🌄 07:00", "07:00"), ("☀️ 08:00", "08:00"),
-            ("🌞 09:00", "09:00"), ("🕙 10:00", "10:00"), ("🕚 11:00", "11:00"),
-            ("🕛 12:00", "12:00"), ("🕐 13:00", "13:00"), ("🕑 14:00", "14:00"),
-            ("🕒 15:00", "15:00"), ("🕓 16:00", "16:00"), ("🕔 17:00", "17:00"),
-            ("🕕 18:00", "18:00"), ("🕖 19:00", "19:00"), ("🕗 20:00", "20:00"),
-            ("🕘 21:00", "21:00"), ("🕙 22:00", "22:00"), ("🕚 23:00", "23:00")
-        ]
-        
-        for text, time_val in times:
-            builder.add(InlineKeyboardButton(
-                text=text, 
-                callback_data=f"schedule_time_{time_val}"
-            ))
-        
-        # Arrange 3 buttons per row
-        builder.adjust(3)
-        
-        builder.row(
-            InlineKeyboardButton(text="✏️ Enter custom time", callback_data="custom_schedule_time")
-        )
-        builder.row(
-            InlineKeyboardButton(text="🔙 Back to settings", callback_data="settings_menu")
-        )
-        
-        return builder.as_markup()
-    
+        return SCHEDULE_TIME_MENU
+
     @staticmethod
     def interval_hours_menu() -> InlineKeyboardMarkup:
         """Menu for selecting interval in hours"""
-        builder = InlineKeyboardBuilder()
-        
-        intervals = [
-            ("1 hour", 1), ("2 hours", 2), ("3 hours", 3),
-            ("4 hours", 4), ("6 hours", 6), ("8 hours", 8),
-            ("12 hours", 12), ("24 hours", 24)
-        ]
-        
-        for text, hours in intervals:
-            builder.add(InlineKeyboardButton(
-                text=text, 
-                callback_data=f"interval_hours_{hours}"
-            ))
-        
-        builder.adjust(2)
-        
-        builder.row(
-            InlineKeyboardButton(text="🔙 Back to settings", callback_data="settings_menu")
-        )
-        
-        return builder.as_markup()
-    
+        return INTERVAL_HOURS_MENU
+
     @staticmethod
     def image_quality_menu() -> InlineKeyboardMarkup:
         """Menu for selecting image quality"""
-        builder = InlineKeyboardBuilder()
-        
-        qualities = [
-            ("🔴 Low (50%)", 50),
-            ("🟡 Medium (70%)", 70),
-            ("🟢 Good (85%)", 85),
-            ("🔵 High (95%)", 95),
-            ("⭐ Maximum (100%)", 100)
-        ]
-        
-        for text, quality in qualities:
-            builder.add(InlineKeyboardButton(
-                text=text, 
-                callback_data=f"image_quality_{quality}"
-            ))
-        
-        builder.adjust(1)
-        
-        builder.row(
-            InlineKeyboardButton(text="🔙 Back to settings", callback_data="settings_menu")
-        )
-        
-        return builder.as_markup()
-    
+        return IMAGE_QUALITY_MENU
+
     @staticmethod
     def books_menu() -> InlineKeyboardMarkup:
         """Book management menu"""
-        builder = InlineKeyboardBuilder()
-        
-        builder.row(
-            InlineKeyboardButton(text="📤 Upload book", callback_data="upload_book"),
-            InlineKeyboardButton(text="📚 Book list", callback_data="list_books")
-        )
-        builder.row(
-            InlineKeyboardButton(text="🔄 Change book", callback_data="change_book"),
-            InlineKeyboardButton(text="📊 Reading progress", callback_data="reading_progress")
-        )
-        builder.row(
-            InlineKeyboardButton(text="🔙 Back", callback_data="main_menu")
-        )
-        
-        return builder.as_markup()
-    
+        return BOOKS_MENU
+
     @staticmethod
+    @lru_cache(maxsize=256)
     def confirmation_menu(action: str) -> InlineKeyboardMarkup:
         """Action confirmation menu"""
-        builder = InlineKeyboardBuilder()
-        
-        builder.row(
-            InlineKeyboardButton(text="✅ Yes", callback_data=f"confirm_{action}"),
-            InlineKeyboardButton(text="❌ No", callback_data="cancel_action")
-        )
-        
-        return builder.as_markup()
-    
+        return _rows([
+            [
+                ("✅ Yes", f"confirm_{action}"),
+                ("❌ No", "cancel_action")
+            ],
+        ])
+
     @staticmethod
     def navigation_menu(current_page: int, total_pages: int) -> InlineKeyboardMarkup:
         """Page navigation menu"""
-        builder = InlineKeyboardBuilder()
-        
-        # Кнопки навигации
-        nav_buttons = []
-        
-        if current_page > 1:
-            nav_buttons.append(InlineKeyboardButton(text="⏮️ Первая", callback_data="goto_page_1"))
-            nav_buttons.append(InlineKeyboardButton(text="◀️ Назад", callback_data=f"goto_page_{current_page-1}"))
-        
-        nav_buttons.append(InlineKeyboardButton(
-            text=f"📄 {current_page}/{total_pages}", 
-            callback_data="current_page_info"
-        ))
-        
-        if current_page < total_pages:
-            nav_buttons.append(InlineKeyboardButton(text="▶️ Вперед", callback_data=f"goto_page_{current_page+1}"))
-            nav_buttons.append(InlineKeyboardButton(text="⏭️ Последняя", callback_data=f"goto_page_{total_pages}"))
-        
-        # Добавляем кнопки навигации
-        for button in nav_buttons:
-            builder.add(button)
-        
-        builder.adjust(2 if len(nav_buttons) <= 4 else 3)
-        
-        # Дополнительные действия
-        builder.row(
-            InlineKeyboardButton(text="🔍 Перейти к странице", callback_data="goto_page"),
-            InlineKeyboardButton(text="📄 Следующие страницы", callback_data="next_pages")
-        )
-        
-        builder.row(
-            InlineKeyboardButton(text="🔙 Главное меню", callback_data="main_menu")
-        )
-        
-        return builder.as_markup()
-    
+        return _navigation_menu(current_page, total_pages)
+
     @staticmethod
+    @lru_cache(maxsize=256)
     def toggle_button(setting_name: str, current_value: bool) -> InlineKeyboardMarkup:
         """Кнопка переключения настройки"""
-        builder = InlineKeyboardBuilder()
-        
         status_text = "🟢 Включено" if current_value else "🔴 Выключено"
         action = "disable" if current_value else "enable"
-        
-        builder.row(
-            InlineKeyboardButton(
-                text=f"{status_text} (нажмите для изменения)", 
-                callback_data=f"toggle_{setting_name}_{action}"
-            )
-        )
-        builder.row(
-            InlineKeyboardButton(text="🔙 Назад к настройкам", callback_data="settings_menu")
-        )
-        
-        return builder.as_markup()
-    
+
+        return _rows([
+            [(f"{status_text} (нажмите для изменения)", f"toggle_{setting_name}_{action}")],
+            [_BACK_SETTINGS_RU],
+        ])
+
     @staticmethod
     def admin_menu() -> InlineKeyboardMarkup:
         """Меню администратора"""
-        builder = InlineKeyboardBuilder()
-        
-        builder.row(
-            InlineKeyboardButton(text="👥 Пользователи", callback_data="admin_users"),
-            InlineKeyboardButton(text="🖥️ Система", callback_data="admin_system")
-        )
-        builder.row(
-            InlineKeyboardButton(text="📝 Логи", callback_data="admin_logs"),
-            InlineKeyboardButton(text="📦 Backup", callback_data="admin_backup")
-        )
-        builder.row(
-            InlineKeyboardButton(text="🧹 Очистка", callback_data="admin_cleanup"),
-            InlineKeyboardButton(text="⚙️ Настройки", callback_data="admin_settings")
-        )
-        builder.row(
-            InlineKeyboardButton(text="🔙 Главное меню", callback_data="main_menu")
-        )
-        
-        return builder.as_markup()
-    
+        return ADMIN_MENU
+
     @staticmethod
     def users_management_menu() -> InlineKeyboardMarkup:
         """Меню управления пользователями"""
-        builder = InlineKeyboardBuilder()
-        
-        builder.row(
-            InlineKeyboardButton(text="📊 Статистика", callback_data="users_stats"),
-            InlineKeyboardButton(text="👤 Список", callback_data="users_list")
-        )
-        builder.row(
-            InlineKeyboardButton(text="🔍 Поиск", callback_data="users_search"),
-            InlineKeyboardButton(text="📈 Активность", callback_data="users_activity")
-        )
-        builder.row(
-            InlineKeyboardButton(text="🚫 Заблокированные", callback_data="users_blocked"),
-            InlineKeyboardButton(text="⚙️ Настройки", callback_data="users_settings")
-        )
-        builder.row(
-            InlineKeyboardButton(text="🔙 Админ панель", callback_data="admin_menu")
-        )
-        
-        return builder.as_markup()
-    
+        return USERS_MANAGEMENT_MENU
+
     @staticmethod
     def status_menu() -> InlineKeyboardMarkup:
         """Меню статуса чтения"""
-        builder = InlineKeyboardBuilder()
-        
-        builder.row(
-            InlineKeyboardButton(text="📄 Следующие страницы", callback_data="next_pages"),
-            InlineKeyboardButton(text="🔄 Обновить статус", callback_data="status")
-        )
-        builder.row(
-            InlineKeyboardButton(text="🔙 Главное меню", callback_data="main_menu")
-        )
-        
-        return builder.as_markup()
-    
+        return STATUS_MENU
+
     @staticmethod
     def system_menu() -> InlineKeyboardMarkup:
         """Меню системы"""
-        builder = InlineKeyboardBuilder()
-        
-        builder.row(
-            InlineKeyboardButton(text="🔄 Обновить", callback_data="system_refresh"),
-            InlineKeyboardButton(text="📊 Мониторинг", callback_data="system_monitoring")
-        )
-        builder.row(
-            InlineKeyboardButton(text="🗂️ Хранилище", callback_data="system_storage"),
-            InlineKeyboardButton(text="⚡ Производительность", callback_data="system_performance")
-        )
-        builder.row(
-            InlineKeyboardButton(text="🔧 Конфигурация", callback_data="system_config"),
-            InlineKeyboardButton(text="🔄 Перезапуск", callback_data="system_restart")
-        )
-        builder.row(
-            InlineKeyboardButton(text="🔙 Админ панель", callback_data="admin_menu")
-        )
-        
-        return builder.as_markup()
-    
+        return SYSTEM_MENU
+
     @staticmethod
     def logs_menu() -> InlineKeyboardMarkup:
         """Меню логов"""
-        builder = InlineKeyboardBuilder()
-        
-        builder.row(
-            InlineKeyboardButton(text="🔄 Обновить", callback_data="logs_refresh"),
-            InlineKeyboardButton(text="📄 Полные логи", callback_data="logs_full")
-        )
-        builder.row(
-            InlineKeyboardButton(text="🔴 Ошибки", callback_data="logs_errors"),
-            InlineKeyboardButton(text="🟡 Предупреждения", callback_data="logs_warnings")
-        )
-        builder.row(
-            InlineKeyboardButton(text="📊 Статистика", callback_data="logs_stats"),
-            InlineKeyboardButton(text="🗑️ Очистить", callback_data="logs_clear")
-        )
-        builder.row(
-            InlineKeyboardButton(text="🔙 Админ панель", callback_data="admin_menu")
-        )
-        
-        return builder.as_markup()
-    
+        return LOGS_MENU
+
     @staticmethod
     def backup_menu() -> InlineKeyboardMarkup:
         """Меню резервного копирования"""
-        builder = InlineKeyboardBuilder()
-        
-        builder.row(
-            InlineKeyboardButton(text="📦 Создать backup", callback_data="backup_create"),
-            InlineKeyboardButton(text="📋 Список backup'ов", callback_data="backup_list")
-        )
-        builder.row(
-            InlineKeyboardButton(text="📥 Восстановить", callback_data="backup_restore"),
-            InlineKeyboardButton(text="🗑️ Удалить старые", callback_data="backup_cleanup")
-        )
-        builder.row(
-            InlineKeyboardButton(text="⚙️ Настройки", callback_data="backup_settings"),
-            InlineKeyboardButton(text="📊 Статистика", callback_data="backup_stats")
-        )
-        builder.row(
-            InlineKeyboardButton(text="🔙 Админ панель", callback_data="admin_menu")
-        )
-        
-        return builder.as_markup()
-    
+        return BACKUP_MENU
+
     @staticmethod
     def cleanup_menu() -> InlineKeyboardMarkup:
         """Меню очистки"""
-        builder = InlineKeyboardBuilder()
-        
-        builder.row(
-            InlineKeyboardButton(text="🧹 Запустить очистку", callback_data="cleanup_run"),
-            InlineKeyboardButton(text="📊 Статистика", callback_data="cleanup_stats")
-        )
-        builder.row(
-            InlineKeyboardButton(text="🖼️ Изображения", callback_data="cleanup_images"),
-            InlineKeyboardButton(text="📁 Загрузки", callback_data="cleanup_uploads")
-        )
-        builder.row(
-            InlineKeyboardButton(text="🗑️ Логи", callback_data="cleanup_logs"),
-            InlineKeyboardButton(text="⚙️ Настройки", callback_data="cleanup_settings")
-        )
-        builder.row(
-            InlineKeyboardButton(text="🔙 Админ панель", callback_data="admin_menu")
-        )
-        
-        return builder.as_markup()
-    
+        return CLEANUP_MENU
+
     @staticmethod
     def page_navigation() -> InlineKeyboardMarkup:
         """Простая навигационная клавиатура"""
-        builder = InlineKeyboardBuilder()
-        
-        builder.row(
-            InlineKeyboardButton(text="🏠 Главное меню", callback_data="main_menu")
-        )
-        
-        return builder.as_markup()
\ No newline at end of file
+        return PAGE_NAVIGATION_MENU
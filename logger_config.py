@@ -1,32 +1,226 @@
+import atexit
 import logging
 import logging.handlers
 import os
+import queue
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
+from typing import Any
 
+from config import get_config
+
+# getLogger takes the logging module lock on every call, look these up once
+_USER_LOGGER = logging.getLogger('user_actions')
+_ROOT_LOGGER = logging.getLogger()
+
+try:
+    import orjson
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj).decode('utf-8')
+
+    def _loads(s: str) -> Any:
+        return orjson.loads(s)
+except ImportError:  # orjson is optional, the stdlib produces the same lines
+    import json
+
+    def _dumps(obj) -> str:
+        return json.dumps(obj, ensure_ascii=False)
+
+    def _loads(s: str) -> Any:
+        return json.loads(s)
+
+
+class JsonFormatter(logging.Formatter):
+    """Одна JSON-запись на строку: timestamp, name, level, message (+ traceback)
+
+    the keys are the ones get_recent_logs returns, so reading a line back is a
+    single loads() instead of splitting on ' - ' (which messages may contain)
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'timestamp': self.formatTime(record, self.datefmt),
+            'name': record.name,
+            'level': record.levelname,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            # same caching as logging.Formatter, other handlers reuse the text
+            if not record.exc_text:
+                record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc_info'] = record.exc_text
+        return _dumps(entry)
+
+
+def _parse_log_line(line: str) -> dict:
+    """Разбор строки лога: JSON, либо старый текстовый формат"""
+    if line.startswith('{'):
+        try:
+            return _loads(line)
+        except ValueError:
+            pass
+
+    # lines written before the switch to JSON
+    parts = line.split(' - ', 3)
+    if len(parts) >= 4:
+        return {
+            'timestamp': parts[0],
+            'name': parts[1],
+            'level': parts[2],
+            'message': parts[3]
+        }
+    # If parsing fails, add as is
+    return {
+        'timestamp': 'Unknown',
+        'name': 'Unknown',
+        'level': 'INFO',
+        'message': line
+    }
+
+
+
+# a log line is ~100-200 bytes, so one block usually covers a /logs request
+_TAIL_BLOCK = 8192
+
+
+def _iter_lines_reverse(path: Path, block_size: int = _TAIL_BLOCK):
+    """Непустые строки файла от последней к первой
+
+    reads fixed blocks backwards from the end, so callers that stop early
+    (enough lines, enough matches) never touch the rest of the file; only the
+    yielded lines are decoded
+    """
+    with open(path, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END)
+        rest = b''
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            lines = (f.read(step) + rest).split(b'\n')
+            # the first piece may continue in the previous block
+            rest = lines[0]
+            for line in reversed(lines[1:]):
+                if line.strip():
+                    yield line.decode('utf-8', errors='replace').strip()
+        if rest.strip():
+            yield rest.decode('utf-8', errors='replace').strip()
+
+
+def log_user_action(user_id: int, username: str, action: str, details: str = ""):
+    """Логирование действий пользователей"""
+    # called on every command and callback: skip all the call setup when
+    # INFO is silenced for this logger
+    if _USER_LOGGER.isEnabledFor(logging.INFO):
+        _USER_LOGGER.info("User %s (@%s) - %s - %s", user_id, username, action, details)
+
+
+def log_error(error: Exception, context: str = ""):
+    """Логирование ошибок с контекстом"""
+    # exc_info=True walks the traceback, only do it if ERROR is logged at all
+    if _ROOT_LOGGER.isEnabledFor(logging.ERROR):
+        _ROOT_LOGGER.error("Error in %s: %s", context, error, exc_info=True)
+
+
+def get_recent_logs(count: int = 50):
+    """Retrieves recent log entries from the log file"""
+    log_file = Path("logs") / "bot.log"
+    logs = []
+    
+    try:
+        if log_file.exists():
+            lines = list(islice(_iter_lines_reverse(log_file), count))
+            for line in reversed(lines):
+                logs.append(_parse_log_line(line))
+    except Exception as e:
+        logging.error(f"Error reading log file: {e}")
+    
+    return logs
+
+
+def get_logs_by_level(level: str, count: int = 50):
+    """Получить логи определенного уровня"""
+    log_file = Path("logs") / "bot.log"
+    level = level.upper()
+    filtered_logs = []
+    
+    try:
+        if log_file.exists():
+            # Читаем с конца, пока не наберем count записей нужного уровня
+            for line in _iter_lines_reverse(log_file):
+                log = _parse_log_line(line)
+                if log.get('level', '').upper() == level:
+                    filtered_logs.append(log)
+                    if len(filtered_logs) == count:
+                        break
+    except Exception as e:
+        logging.error(f"Error reading log file: {e}")
+    
+    filtered_logs.reverse()
+    return filtered_logs
+
+
+def clear_logs():
+    """Очистить лог файлы"""
+    log_dir = Path("logs")
+    cleared = []
+    try:
+        # scandir entries already know their type, no stat per file
+        with os.scandir(log_dir) as entries:
+            for entry in entries:
+                if ".log" in entry.name and entry.is_file(follow_symlinks=False):
+                    os.unlink(entry.path)
+                    cleared.append(entry.name)
+    except Exception as e:
+        logging.error(f"Error clearing logs: {e}")
+    if cleared:
+        logging.info(f"Cleared {len(cleared)} log files: {', '.join(cleared)}")
 
 
 class BotLogger:
-    """Настройка логирования для бота с ротацией файлов"""
+    """Настройка логирования для бота с ротацией файлов
+
+    only holds the setup state; the helpers are module functions, kept here as
+    static aliases for the existing BotLogger.log_user_action(...) callers
+    """
+
+    __slots__ = ("log_dir", "_listener")
+
+    log_user_action = staticmethod(log_user_action)
+    log_error = staticmethod(log_error)
+    get_recent_logs = staticmethod(get_recent_logs)
+    get_logs_by_level = staticmethod(get_logs_by_level)
+    clear_logs = staticmethod(clear_logs)
     
     def __init__(self):
         self.log_dir = Path("logs")
         self.log_dir.mkdir(exist_ok=True)
+        self._listener = None
         
     def setup_logging(self):
         """Настройка системы логирования"""
         # Создаем основной логгер
         logger = logging.getLogger()
+        
+        # init_logging() can run more than once (tests, reloads); a second
+        # setup would start another listener thread and write every record twice
+        if getattr(logger, "_bot_configured", False):
+            return logger
+        
         logger.setLevel(logging.INFO)
         
         # Очищаем существующие обработчики
         logger.handlers.clear()
         
-        # Форматтер для логов
+        # Форматтер для консоли (текст) и для файлов (JSON lines)
         formatter = logging.Formatter(
             '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
             datefmt='%Y-%m-%d %H:%M:%S'
         )
+        json_formatter = JsonFormatter(datefmt='%Y-%m-%d %H:%M:%S')
         
         # Консольный обработчик
         console_handler = logging.StreamHandler()
@@ -34,118 +228,56 @@ class BotLogger:
         console_handler.setFormatter(formatter)
         logger.addHandler(console_handler)
         
+        # Ротация: в процессе или внешняя (logrotate). with external rotation
+        # the handler only checks whether the file was moved, no size check
+        # and no renames inside the bot
+        external_rotation = get_config().log_rotation == "external"
+        
+        def file_handler_for(name: str, max_bytes: int, backup_count: int) -> logging.Handler:
+            if external_rotation:
+                return logging.handlers.WatchedFileHandler(
+                    filename=self.log_dir / name,
+                    encoding='utf-8'
+                )
+            return logging.handlers.RotatingFileHandler(
+                filename=self.log_dir / name,
+                maxBytes=max_bytes,
+                backupCount=backup_count,
+                encoding='utf-8'
+            )
+        
         # Файловый обработчик с ротацией
-        file_handler = logging.handlers.RotatingFileHandler(
-            filename=self.log_dir / "bot.log",
-            maxBytes=10 * 1024 * 1024,  # 10 MB
-            backupCount=5,
-            encoding='utf-8'
-        )
+        file_handler = file_handler_for("bot.log", 10 * 1024 * 1024, 5)  # 10 MB
         file_handler.setLevel(logging.INFO)
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        file_handler.setFormatter(json_formatter)
         
         # Отдельный файл для ошибок
-        error_handler = logging.handlers.RotatingFileHandler(
-            filename=self.log_dir / "errors.log",
-            maxBytes=5 * 1024 * 1024,  # 5 MB
-            backupCount=3,
-            encoding='utf-8'
-        )
+        error_handler = file_handler_for("errors.log", 5 * 1024 * 1024, 3)  # 5 MB
         error_handler.setLevel(logging.ERROR)
-        error_handler.setFormatter(formatter)
-        logger.addHandler(error_handler)
+        error_handler.setFormatter(json_formatter)
         
-        # Логгер для пользовательских действий
+        # Логгер для пользовательских действий: its records propagate to the
+        # root queue like before, the file handler only keeps its own
         user_logger = logging.getLogger('user_actions')
-        user_handler = logging.handlers.RotatingFileHandler(
-            filename=self.log_dir / "user_actions.log",
-            maxBytes=5 * 1024 * 1024,  # 5 MB
-            backupCount=3,
-            encoding='utf-8'
-        )
-        user_handler.setFormatter(formatter)
-        user_logger.addHandler(user_handler)
+        user_handler = file_handler_for("user_actions.log", 5 * 1024 * 1024, 3)  # 5 MB
+        user_handler.setFormatter(json_formatter)
+        user_handler.addFilter(logging.Filter('user_actions'))
         user_logger.setLevel(logging.INFO)
         
-        return logger
-    
-    @staticmethod
-    def log_user_action(user_id: int, username: str, action: str, details: str = ""):
-        """Логирование действий пользователей"""
-        user_logger = logging.getLogger('user_actions')
-        user_logger.info(
-            f"User {user_id} (@{username}) - {action} - {details}"
+        # Файлы пишутся в фоновом потоке: the event loop only puts records on
+        # a queue, the listener does the disk writes and rotation
+        log_queue = queue.SimpleQueue()
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        self._listener = logging.handlers.QueueListener(
+            log_queue, file_handler, error_handler, user_handler,
+            respect_handler_level=True
         )
-    
-    @staticmethod
-    def log_error(error: Exception, context: str = ""):
-        """Логирование ошибок с контекстом"""
-        logger = logging.getLogger()
-        logger.error(f"Error in {context}: {str(error)}", exc_info=True)
-    
-    @staticmethod
-    def get_recent_logs(count: int = 50):
-        """Retrieves recent log entries from the log file"""
-        log_file = Path("logs") / "bot.log"
-        logs = []
-        
-        try:
-            if log_file.exists():
-                with open(log_file, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-                    
-                # Get the last lines
-                recent_lines = lines[-count:] if len(lines) > count else lines
-                
-                for line in recent_lines:
-                    line = line.strip()
-                    if line:
-                        # Parse the log line
-                        parts = line.split(' - ', 3)
-                        if len(parts) >= 4:
-                            timestamp = parts[0]
-                            name = parts[1]
-                            level = parts[2]
-                            message = parts[3]
-                            
-                            logs.append({
-                                'timestamp': timestamp,
-                                'name': name,
-                                'level': level,
-                                'message': message
-                            })
-                        else:
-                            # If parsing fails, add as is
-                            logs.append({
-                                'timestamp': 'Unknown',
-                                'name': 'Unknown',
-                                'level': 'INFO',
-                                'message': line
-                            })
-        except Exception as e:
-            logging.error(f"Error reading log file: {e}")
+        self._listener.start()
+        # flush whatever is still queued when the process exits
+        atexit.register(self._listener.stop)
         
-        return logs
-    
-    @staticmethod
-    def get_logs_by_level(level: str, count: int = 50):
-        """Получить логи определенного уровня"""
-        all_logs = BotLogger.get_recent_logs(count * 2)  # Берем больше, чтобы отфильтровать
-        filtered_logs = [log for log in all_logs if log.get('level', '').upper() == level.upper()]
-        return filtered_logs[-count:] if len(filtered_logs) > count else filtered_logs
-    
-    @staticmethod
-    def clear_logs():
-        """Очистить лог файлы"""
-        log_dir = Path("logs")
-        try:
-            for log_file in log_dir.glob("*.log*"):
-                if log_file.is_file():
-                    log_file.unlink()
-                    logging.info(f"Cleared log file: {log_file}")
-        except Exception as e:
-            logging.error(f"Error clearing logs: {e}")
+        logger._bot_configured = True
+        return logger
 
 
 # Инициализация логирования
@@ -1,21 +1,25 @@
 import asyncio
 import logging
 import os
+import re
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, List, Optional, Set, Tuple
 
 from aiogram import Bot, Dispatcher, types
-from aiogram.filters import Command
+from aiogram.filters import Command, CommandObject
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.fsm.storage.memory import MemoryStorage
-from aiogram.types import FSInputFile
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import FSInputFile, InputMediaPhoto
 
 from cleanup_manager import CleanupManager
 from config import config, legacy_config, get_config
-from database_manager import DatabaseManager
+from database_manager import DatabaseManager, UserState
 from file_validator import FileValidator
-from pdf_reader import PDFReader
+from pdf_reader import PDFReader, RenderPool
 from scheduler import PDFScheduler
 from logger_config import BotLogger, init_logging
 from user_settings import UserSettings
@@ -27,11 +31,81 @@ from message_handlers import MessageHandler
 from tmp.utils import debug_print, cache
 from tmp.debug_helpers import profiler
 
-# configure logging
-init_logging()
+# configure logging - not in render workers, which spawn this module as
+# __mp_main__ and send their records back to us (see pdf_reader.RenderPool)
+if __name__ != "__mp_main__":
+    init_logging()
 logger = logging.getLogger(__name__)
 
 
+# telegram takes 2-10 photos per album (send_media_group)
+MEDIA_GROUP_LIMIT = 10
+
+# how many users the scheduler works on at the same time
+SCHEDULER_CONCURRENCY = 10
+
+# how many users keep their PDFReader between commands
+READER_CACHE_SIZE = 64
+
+# processes rasterizing pages - mupdf holds the GIL and isn't thread-safe,
+# so threads alone would still stall the event loop and each other
+RENDER_WORKERS = min(4, os.cpu_count() or 1)
+
+# how long an os.path.exists() answer for a book is trusted, and how many we keep
+PDF_EXISTS_TTL = 10
+PDF_EXISTS_CACHE_SIZE = 4096
+
+
+# "/goto 15" or "/goto@SomeBot 15" - anything else gets the usage hint.
+# 6 digits is plenty past the 10k page limit and keeps int() off huge strings
+GOTO_RE = re.compile(r"/goto(?:@\w+)?\s+(\d{1,6})\s*")
+
+# static replies for /start and /help
+WELCOME_TEXT = (
+    "📚 **welcome to PDF Sender Bot!**\n\n"
+    "i help you read books by sending pdf pages on schedule\n\n"
+    "🎯 **main features:**\n"
+    "• automatic page sending\n"
+    "• personal settings\n"
+    "• button controls\n"
+    "• jump to any page\n"
+    "• reading stats\n\n"
+    "📱 use buttons below:"
+)
+
+HELP_TEXT = (
+    "ℹ️ **PDF Sender Bot Help**\n\n"
+    "🤖 **Main functions:**\n"
+    "• Automatic page sending on schedule\n"
+    "• Manually request next pages\n"
+    "• Jump to any page\n"
+    "• Personal settings for each user\n\n"
+    "⚙️ **Settings:**\n"
+    "• Number of pages at once (1-10)\n"
+    "• Auto-send time\n"
+    "• Interval between sends\n"
+    "• Image quality\n"
+    "• Enable/disable auto-send\n\n"
+    "📱 **Main commands:**\n"
+    "/start - Start bot\n"
+    "/help - Help\n"
+    "/settings - Settings\n"
+    "/status - Current status\n"
+    "/next - Next pages\n"
+    "/upload - Upload PDF\n"
+    "/book - Book information\n"
+    "/stats - Statistics\n\n"
+    "🔧 **Admin commands:**\n"
+    "/admin - Admin panel\n"
+    "/users - User management\n"
+    "/system - System info\n"
+    "/logs - View logs\n"
+    "/backup - Backup\n"
+    "/cleanup - Cleanup files\n\n"
+    "💡 **Tip:** Use buttons for easy navigation!"
+)
+
+
 # fsm states for pdf upload - probably could be in separate file but whatever
 class UploadPDF(StatesGroup):
     waiting_for_file = State()
@@ -43,7 +117,11 @@ class PDFSenderBot:
         self.bot = Bot(token=config.bot_token)
         self.dp = Dispatcher(storage=MemoryStorage())
         self.db = DatabaseManager()
-        self.pdf_reader = PDFReader(output_dir=config.output_dir, db=self.db)
+        # workers start on the first render, not here
+        self._render_pool = RenderPool(max_workers=RENDER_WORKERS)
+        self.pdf_reader = PDFReader(
+            output_dir=config.output_dir, db=self.db, render_pool=self._render_pool
+        )
         self.scheduler = PDFScheduler(self)
         
         # init components - could probably organize this better
@@ -51,6 +129,18 @@ class PDFSenderBot:
         self.keyboards = BotKeyboards()
         self.callback_handler = CallbackHandler(self)
         self.message_handler = MessageHandler(self)
+        # pdf path -> (checked_at, exists), see pdf_available()
+        self._exists_cache: Dict[str, Tuple[float, bool]] = {}
+        # user_id -> that user's PDFReader, most recently used last, see _reader()
+        self._readers: "OrderedDict[int, PDFReader]" = OrderedDict()
+        # user_id -> lock held while a thread works on that user's reader, so
+        # renders and book swaps dont race; lives and dies with the reader
+        self._render_locks: Dict[int, asyncio.Lock] = {}
+        # background renders of the next batch, see _start_prerender()
+        self._prerender_tasks: Set[asyncio.Task] = set()
+        self._prerender_limit = asyncio.Semaphore(1)
+        # one check_and_send_pages() at a time, see there
+        self._check_lock = asyncio.Lock()
 
         # make upload dir if it doesnt exist
         os.makedirs(config.upload_dir, exist_ok=True)
@@ -65,25 +155,31 @@ class PDFSenderBot:
 
     def _register_handlers(self):
         """register all bot handlers - lots of them"""
-        # command handlers - probably too many but oh well
-        self.dp.message.register(self.start_handler, Command("start"))
-        self.dp.message.register(self.help_handler, Command("help"))
-        self.dp.message.register(self.settings_handler, Command("settings"))
-        self.dp.message.register(self.status_handler, Command("status"))
-        self.dp.message.register(self.next_pages_handler, Command("next"))
-        self.dp.message.register(self.current_page_handler, Command("current"))
-        self.dp.message.register(self.goto_page_handler, Command("goto"))
-        self.dp.message.register(self.book_command, Command("book"))
+        # command handlers - probably too many but oh well.
+        # one Command filter for the whole table instead of one per handler,
+        # so a message is parsed once and routed with a dict lookup
+        self.commands = {
+            "start": self.start_handler,
+            "help": self.help_handler,
+            "settings": self.settings_handler,
+            "status": self.status_handler,
+            "next": self.next_pages_handler,
+            "current": self.current_page_handler,
+            "goto": self.goto_page_handler,
+            "book": self.book_command,
+            "stats": self.stats_command,
+            "leaderboard": self.leaderboard_command,
+            "achievements": self.achievements_command,
+            "admin": self.admin_command,
+            "logs": self.logs_command,
+            "users": self.users_command,
+            "system": self.system_command,
+            "backup": self.backup_command,
+            "cleanup": self.cleanup_command,
+        }
+        self.dp.message.register(self._dispatch_command, Command(*self.commands))
+        # /upload needs the fsm context, so it keeps its own registration
         self.dp.message.register(self.upload_command, Command("upload"))
-        self.dp.message.register(self.stats_command, Command("stats"))
-        self.dp.message.register(self.leaderboard_command, Command("leaderboard"))
-        self.dp.message.register(self.achievements_command, Command("achievements"))
-        self.dp.message.register(self.admin_command, Command("admin"))
-        self.dp.message.register(self.logs_command, Command("logs"))
-        self.dp.message.register(self.users_command, Command("users"))
-        self.dp.message.register(self.system_command, Command("system"))
-        self.dp.message.register(self.backup_command, Command("backup"))
-        self.dp.message.register(self.cleanup_command, Command("cleanup"))
 
         # Callback query handlers
         self.dp.callback_query.register(self.callback_handler.handle_callback)
@@ -94,6 +190,29 @@ class PDFSenderBot:
         # Upload PDF handlers
         self.dp.message.register(self.process_pdf_upload, UploadPDF.waiting_for_file)
 
+    async def _dispatch_command(self, message: types.Message, command: CommandObject):
+        """route a command from the table in _register_handlers"""
+        await self.commands[command.command](message)
+
+    async def run_db(self, fn, *args):
+        """run a db write in a worker thread - saving rewrites the whole json file"""
+        return await asyncio.to_thread(fn, *args)
+
+    def pdf_available(self, pdf_path: Optional[str]) -> bool:
+        """os.path.exists() for a user's book, remembered for PDF_EXISTS_TTL seconds"""
+        if not pdf_path:
+            return False
+        now = time.monotonic()
+        cached = self._exists_cache.get(pdf_path)
+        if cached is not None and now - cached[0] < PDF_EXISTS_TTL:
+            return cached[1]
+
+        exists = os.path.exists(pdf_path)
+        if len(self._exists_cache) >= PDF_EXISTS_CACHE_SIZE:
+            self._exists_cache.clear()
+        self._exists_cache[pdf_path] = (now, exists)
+        return exists
+
     async def start_handler(self, message: types.Message):
         """handle /start command"""
         if message.from_user is None:
@@ -103,25 +222,13 @@ class PDFSenderBot:
         username = message.from_user.username or "unknown"
 
         # add user to db
-        self.db.add_user(user_id, username)
+        await self.run_db(self.db.add_user, user_id, username)
         
         # log user action
         BotLogger.log_user_action(user_id, username, "start_command")
 
-        welcome_text = (
-            "📚 **welcome to PDF Sender Bot!**\n\n"
-            "i help you read books by sending pdf pages on schedule\n\n"
-            "🎯 **main features:**\n"
-            "• automatic page sending\n"
-            "• personal settings\n"
-            "• button controls\n"
-            "• jump to any page\n"
-            "• reading stats\n\n"
-            "📱 use buttons below:"
-        )
-
         await message.answer(
-            welcome_text,
+            WELCOME_TEXT,
             reply_markup=self.keyboards.main_menu(),
             parse_mode="Markdown"
         )
@@ -158,40 +265,8 @@ class PDFSenderBot:
         # Log user action
         BotLogger.log_user_action(user_id, username, "help_command")
         
-        help_text = (
-            "ℹ️ **PDF Sender Bot Help**\n\n"
-            "🤖 **Main functions:**\n"
-            "• Automatic page sending on schedule\n"
-            "• Manually request next pages\n"
-            "• Jump to any page\n"
-            "• Personal settings for each user\n\n"
-            "⚙️ **Settings:**\n"
-            "• Number of pages at once (1-10)\n"
-            "• Auto-send time\n"
-            "• Interval between sends\n"
-            "• Image quality\n"
-            "• Enable/disable auto-send\n\n"
-            "📱 **Main commands:**\n"
-            "/start - Start bot\n"
-            "/help - Help\n"
-            "/settings - Settings\n"
-            "/status - Current status\n"
-            "/next - Next pages\n"
-            "/upload - Upload PDF\n"
-            "/book - Book information\n"
-            "/stats - Statistics\n\n"
-            "🔧 **Admin commands:**\n"
-            "/admin - Admin panel\n"
-            "/users - User management\n"
-            "/system - System info\n"
-            "/logs - View logs\n"
-            "/backup - Backup\n"
-            "/cleanup - Cleanup files\n\n"
-            "💡 **Tip:** Use buttons for easy navigation!"
-        )
-        
         await message.answer(
-            help_text,
+            HELP_TEXT,
             reply_markup=self.keyboards.main_menu(),
             parse_mode="Markdown"
         )
@@ -207,7 +282,8 @@ class PDFSenderBot:
         BotLogger.log_user_action(user_id, username, "status_command")
 
         # Check if user exists
-        if not self.db.get_user(user_id):
+        state = self.db.get_user_state(user_id)
+        if not state.exists:
             await message.answer(
                 "❌ **Need to start bot**\n\n"
                 "Use /start command",
@@ -217,8 +293,8 @@ class PDFSenderBot:
             return
 
         # Check if user has a PDF
-        pdf_path = self.db.get_pdf_path(user_id)
-        if not pdf_path or not os.path.exists(pdf_path):
+        pdf_path = state.pdf_path
+        if not self.pdf_available(pdf_path):
             await message.answer(
                 "❌ **Book not uploaded**\n\n"
                 "First upload a PDF book using /upload command",
@@ -230,13 +306,13 @@ class PDFSenderBot:
         # Get user settings
         settings = self.user_settings.get_user_settings(user_id)
         
-        current_page = self.db.get_current_page(user_id)
-        total_pages = self.db.get_total_pages(user_id)
+        current_page = state.current_page
+        total_pages = state.total_pages
         progress = (current_page / total_pages) * 100 if total_pages > 0 else 0
         filename = os.path.basename(pdf_path)
 
         # Get last sent time
-        last_sent = self.db.get_last_sent(user_id)
+        last_sent = state.last_sent
         if last_sent:
             last_sent_str = last_sent.strftime("%d.%m.%Y %H:%M")
             # Calculate next send time based on user's interval
@@ -286,14 +362,15 @@ class PDFSenderBot:
         BotLogger.log_user_action(user_id, username, "next_pages")
 
         # check if user exists - basic validation
-        if not self.db.get_user(user_id):
+        state = self.db.get_user_state(user_id)
+        if not state.exists:
             await message.answer("you need to start the bot first with /start!", 
                                reply_markup=self.keyboards.main_menu())
             return
 
         # check if user has pdf
-        pdf_path = self.db.get_pdf_path(user_id)
-        if not pdf_path or not os.path.exists(pdf_path):
+        pdf_path = state.pdf_path
+        if not self.pdf_available(pdf_path):
             await message.answer(
                 "you need to upload a pdf book first! use /upload",
                 reply_markup=self.keyboards.main_menu()
@@ -305,8 +382,8 @@ class PDFSenderBot:
             user_settings = self.user_settings.get_user_settings(user_id)
             pages_per_send = user_settings["pages_per_send"]
             
-            current_page = self.db.get_current_page(user_id)
-            total_pages = self.db.get_total_pages(user_id)
+            current_page = state.current_page
+            total_pages = state.total_pages
             
             # check if book is finished
             if current_page >= total_pages:
@@ -319,7 +396,7 @@ class PDFSenderBot:
             await self.send_pages_to_user(user_id, current_page)
 
             # increment page - this is kinda hacky but works
-            new_page = self.db.increment_page(user_id, pages_per_send)
+            new_page = await self.run_db(self.db.increment_page, user_id, pages_per_send)
             
             end_page = min(current_page + pages_per_send - 1, total_pages)
             await message.answer(
@@ -347,14 +424,15 @@ class PDFSenderBot:
         BotLogger.log_user_action(user_id, username, "current_page")
 
         # Check if user exists
-        if not self.db.get_user(user_id):
+        state = self.db.get_user_state(user_id)
+        if not state.exists:
             await message.answer("Вам нужно сначала запустить бота командой /start!",
                                reply_markup=self.keyboards.main_menu())
             return
 
         # Check if user has a PDF
-        pdf_path = self.db.get_pdf_path(user_id)
-        if not pdf_path or not os.path.exists(pdf_path):
+        pdf_path = state.pdf_path
+        if not self.pdf_available(pdf_path):
             await message.answer(
                 "Вам нужно сначала загрузить PDF книгу! Используйте команду /upload.",
                 reply_markup=self.keyboards.main_menu()
@@ -366,43 +444,23 @@ class PDFSenderBot:
             user_settings = self.user_settings.get_user_settings(user_id)
             image_quality = user_settings["image_quality"]
             
-            current_page = self.db.get_current_page(user_id)
-            total_pages = self.db.get_total_pages(user_id)
+            current_page = state.current_page
+            total_pages = state.total_pages
             
-            # Create PDFReader instance
-            pdf_reader = PDFReader(
-                user_id=user_id, output_dir=legacy_config.OUTPUT_DIR, db=self.db
+            progress_percent = int((current_page / total_pages) * 100) if total_pages > 0 else 0
+            caption = f"📖 **Прогресс чтения**\n\n"
+            caption += f"📄 Страница: {current_page}/{total_pages}\n"
+            caption += f"📊 Прогресс: {progress_percent}%"
+            reply_markup = self.keyboards.reading_progress_menu(current_page, total_pages)
+
+            sent = await self._send_single_page(
+                user_id, current_page, caption, parse_mode="Markdown", reply_markup=reply_markup
             )
-            image_paths = pdf_reader.extract_pages_as_images(
-                current_page, 1
-            )
-
-            if image_paths:
-                photo = FSInputFile(image_paths[0])
-                progress_percent = int((current_page / total_pages) * 100) if total_pages > 0 else 0
-                caption = f"📖 **Прогресс чтения**\n\n"
-                caption += f"📄 Страница: {current_page}/{total_pages}\n"
-                caption += f"📊 Прогресс: {progress_percent}%"
-                
-                await self.bot.send_photo(
-                    chat_id=user_id,
-                    photo=photo,
-                    caption=caption,
-                    parse_mode="Markdown",
-                    reply_markup=self.keyboards.reading_progress_menu(current_page, total_pages)
-                )
-                pdf_reader.cleanup_images()
-            else:
-                progress_percent = int((current_page / total_pages) * 100) if total_pages > 0 else 0
-                text = f"📖 **Прогресс чтения**\n\n"
-                text += f"📄 Страница: {current_page}/{total_pages}\n"
-                text += f"📊 Прогресс: {progress_percent}%\n\n"
-                text += "(Не удалось отобразить изображение)"
-                
+            if not sent:
                 await message.answer(
-                    text,
+                    caption + "\n\n(Не удалось отобразить изображение)",
                     parse_mode="Markdown",
-                    reply_markup=self.keyboards.reading_progress_menu(current_page, total_pages)
+                    reply_markup=reply_markup
                 )
 
         except Exception as e:
@@ -413,34 +471,131 @@ class PDFSenderBot:
 
     def _parse_page_number(self, message_text: str) -> Optional[int]:
         """Parse page number from goto command text"""
-        args = message_text.split()
-        if len(args) != 2:
-            return None
-
-        try:
-            return int(args[1])
-        except ValueError:
-            return None
+        match = GOTO_RE.fullmatch(message_text)
+        return int(match.group(1)) if match else None
+
+    def _reader(self, user_id: int) -> PDFReader:
+        """the user's PDFReader, created on first use and kept for the most active readers"""
+        reader = self._readers.get(user_id)
+        if reader is not None:
+            self._readers.move_to_end(user_id)
+            return reader
+
+        reader = PDFReader(
+            user_id=user_id,
+            output_dir=legacy_config.OUTPUT_DIR,
+            db=self.db,
+            render_pool=self._render_pool,
+        )
+        self._readers[user_id] = reader
+        self._render_locks[user_id] = asyncio.Lock()
+        if len(self._readers) > READER_CACHE_SIZE:
+            evicted, _ = self._readers.popitem(last=False)
+            self._render_locks.pop(evicted, None)
+        return reader
+
+    def _locked_reader(self, user_id: int) -> Tuple[PDFReader, asyncio.Lock]:
+        """the user's reader plus the lock to hold while a thread uses it
+
+        fetched together: if the reader gets evicted and rebuilt meanwhile, the
+        new one comes with a new lock, and whoever waits on the old lock still
+        works on the old reader
+        """
+        reader = self._reader(user_id)
+        return reader, self._render_locks[user_id]
+
+    async def _render_pages(self, user_id: int, start_page: int, count: int) -> List[str]:
+        """render pages of the user's book off the event loop
+
+        the thread only waits on cache lookups and the render pool, mupdf itself
+        runs in a worker process
+        """
+        reader, lock = self._locked_reader(user_id)
+        async with lock:
+            return await asyncio.to_thread(reader.extract_pages_as_images, start_page, count)
+
+    def _start_prerender(self, user_id: int, start_page: int, count: int):
+        """render pages in the background, results land in the page image cache"""
+        task = asyncio.create_task(self._prerender(user_id, start_page, count))
+        # keep a reference until it finishes, otherwise the task can be gc'd mid-run
+        self._prerender_tasks.add(task)
+        task.add_done_callback(self._prerender_tasks.discard)
+
+    async def _prerender(self, user_id: int, start_page: int, count: int):
+        # one background render at a time so it never crowds out real sends
+        async with self._prerender_limit:
+            try:
+                await self._render_pages(user_id, start_page, count)
+            except Exception as e:
+                logger.debug(f"prerender of pages {start_page}+{count} for user {user_id} failed: {e}")
+
+    async def _send_page_photo(self, user_id: int, image_path: str, **kwargs):
+        """send a rendered page, reusing telegram's file_id if this image was uploaded before"""
+        # rendered file names already encode book version, page, dpi and quality
+        image_key = os.path.basename(image_path)
+        file_id = self.db.get_page_file_id(image_key)
+        if file_id:
+            try:
+                return await self.bot.send_photo(chat_id=user_id, photo=file_id, **kwargs)
+            except TelegramBadRequest as e:
+                # stale id (e.g. bot token changed) - upload again below
+                logger.warning(f"cached file_id for {image_key} rejected: {e}")
+
+        sent = await self.bot.send_photo(chat_id=user_id, photo=FSInputFile(image_path), **kwargs)
+        if sent and sent.photo:
+            await self.run_db(self.db.set_page_file_id, image_key, sent.photo[-1].file_id)
+        return sent
+
+    async def _send_page_album(
+        self, user_id: int, image_paths: List[str], captions: List[str], **kwargs
+    ):
+        """send rendered pages as albums of up to MEDIA_GROUP_LIMIT photos, in order"""
+        for start in range(0, len(image_paths), MEDIA_GROUP_LIMIT):
+            chunk = image_paths[start:start + MEDIA_GROUP_LIMIT]
+            chunk_captions = captions[start:start + MEDIA_GROUP_LIMIT]
+            if len(chunk) == 1:
+                # albums need at least 2 photos
+                await self._send_page_photo(user_id, chunk[0], caption=chunk_captions[0], **kwargs)
+                continue
+
+            image_keys = [os.path.basename(path) for path in chunk]
+            file_ids = [self.db.get_page_file_id(key) for key in image_keys]
+
+            def build_media(ids):
+                return [
+                    InputMediaPhoto(media=file_id or FSInputFile(path), caption=caption, **kwargs)
+                    for path, file_id, caption in zip(chunk, ids, chunk_captions)
+                ]
 
-    async def _send_single_page(self, user_id: int, page_number: int):
-        """Send a single page to user"""
-        pdf_reader = PDFReader(
-            user_id=user_id, output_dir=legacy_config.OUTPUT_DIR, db=self.db
+            try:
+                sent = await self.bot.send_media_group(chat_id=user_id, media=build_media(file_ids))
+            except TelegramBadRequest as e:
+                if not any(file_ids):
+                    raise
+                # a stale id spoils the whole album - upload every page again
+                logger.warning(f"cached file_ids for album to {user_id} rejected: {e}")
+                file_ids = [None] * len(chunk)
+                sent = await self.bot.send_media_group(chat_id=user_id, media=build_media(file_ids))
+
+            for image_key, file_id, message in zip(image_keys, file_ids, sent or []):
+                if not file_id and message.photo:
+                    await self.run_db(self.db.set_page_file_id, image_key, message.photo[-1].file_id)
+
+    async def _send_single_page(
+        self, user_id: int, page_number: int, caption: Optional[str] = None, **kwargs
+    ) -> bool:
+        """render one page and send it as a photo, False if it couldn't be rendered"""
+        image_paths = await self._render_pages(user_id, page_number, 1)
+        if not image_paths:
+            return False
+
+        await self._send_page_photo(
+            user_id,
+            image_paths[0],
+            caption=caption or f"📖 Jumped to page {page_number}",
+            **kwargs,
         )
-        image_paths = pdf_reader.extract_pages_as_images(page_number, 1)
-
-        if image_paths:
-            photo = FSInputFile(image_paths[0])
-            await self.bot.send_photo(
-                chat_id=user_id,
-                photo=photo,
-                caption=f"📖 Jumped to page {page_number}",
-            )
-            pdf_reader.cleanup_images()
-        else:
-            await self.bot.send_message(
-                user_id, f"📖 Jumped to page {page_number} (could not render image)"
-            )
+        return True
 
     async def goto_page_handler(self, message: types.Message):
         """Handle /goto command - jump to specific page"""
@@ -453,7 +608,8 @@ class PDFSenderBot:
         BotLogger.log_user_action(user_id, username, "goto_page_command")
 
         # Check if user exists
-        if not self.db.get_user(user_id):
+        state = self.db.get_user_state(user_id)
+        if not state.exists:
             await message.answer(
                 "❌ **Need to start bot**\n\n"
                 "Use /start command",
@@ -463,8 +619,8 @@ class PDFSenderBot:
             return
 
         # Check if user has a PDF
-        pdf_path = self.db.get_pdf_path(user_id)
-        if not pdf_path or not os.path.exists(pdf_path):
+        pdf_path = state.pdf_path
+        if not self.pdf_available(pdf_path):
             await message.answer(
                 "❌ **Book not uploaded**\n\n"
                 "First upload a PDF book using /upload command",
@@ -486,7 +642,7 @@ class PDFSenderBot:
                 )
                 return
 
-            total_pages = self.db.get_total_pages(user_id)
+            total_pages = state.total_pages
             if target_page < 1 or target_page > total_pages:
                 await message.answer(
                     f"❌ **Page out of range**\n\n"
@@ -497,13 +653,16 @@ class PDFSenderBot:
                 return
 
             # Set new current page
-            self.db.set_current_page(user_id, target_page)
+            await self.run_db(self.db.set_current_page, user_id, target_page)
             
             # Get user settings for image quality
             settings = self.user_settings.get_user_settings(user_id)
             
             # Send the target page
-            await self._send_single_page(user_id, target_page)
+            if not await self._send_single_page(user_id, target_page):
+                await self.bot.send_message(
+                    user_id, f"📖 Jumped to page {target_page} (could not render image)"
+                )
             
             BotLogger.log_user_action(user_id, username, f"goto_page: {target_page}")
 
@@ -517,8 +676,13 @@ class PDFSenderBot:
                 reply_markup=self.keyboards.main_menu()
             )
 
-    async def send_pages_to_user(self, user_id: int, page_number: int):
-        """send pdf pages to user"""
+    async def send_pages_to_user(
+        self, user_id: int, page_number: int, state: Optional[UserState] = None
+    ):
+        """send pdf pages to user
+
+        the scheduler passes the UserState it already read so we dont look the user up again
+        """
         debug_print(f"sending pages to user {user_id}, starting from page {page_number}")  # debug
         profiler.track("send_pages_to_user")  # track calls
         
@@ -529,52 +693,51 @@ class PDFSenderBot:
             image_quality = user_settings["image_quality"]
             notifications_enabled = user_settings["notifications_enabled"]
             
+            if state is None:
+                state = self.db.get_user_state(user_id)
+
             # log user action
-            username = self.db.get_user(user_id).get("username", "unknown")
-            BotLogger.log_user_action(user_id, username, f"send_pages: {page_number}")
+            BotLogger.log_user_action(user_id, state.username or "unknown", f"send_pages: {page_number}")
             
-            # create pdf reader instance
-            pdf_reader = PDFReader(
-                user_id=user_id, output_dir=legacy_config.OUTPUT_DIR, db=self.db
-            )
-
             # extract pages as images
-            image_paths = pdf_reader.extract_pages_as_images(
-                page_number, pages_per_send
-            )
+            image_paths = await self._render_pages(user_id, page_number, pages_per_send)
 
             if not image_paths:
                 if notifications_enabled:
                     await self.bot.send_message(user_id, "❌ no pages to send")
                 return
 
-            # send message with page number
-            total_pages = self.db.get_total_pages(user_id)
+            # the "page X of Y" header rides on the first photo's caption
+            # instead of being a separate message. the total comes from the
+            # reader, which just counted the book it rendered - the state was
+            # read before that and can be stale (or 0 for a fresh upload)
+            total_pages = self._reader(user_id).get_total_pages()
             if notifications_enabled:
-                await self.bot.send_message(
-                    user_id, 
-                    f"📖 **page {page_number} of {total_pages}**",
-                    parse_mode="Markdown"
-                )
-
-            # send each page as photo
-            for i, image_path in enumerate(image_paths):
-                # create caption
-                caption = f"📖 page {page_number + i}"
+                first_caption = f"📖 **page {page_number} of {total_pages}**"
+            else:
+                first_caption = f"📖 page {page_number}"
+            captions = [first_caption] + [
+                f"📖 page {page_number + i}" for i in range(1, len(image_paths))
+            ]
 
-                # send photo
-                photo = FSInputFile(image_path)
-                await self.bot.send_photo(chat_id=user_id, photo=photo, caption=caption)
+            # one album per request instead of one send_photo per page; if it
+            # fails we raise before moving the bookmark past pages that didnt arrive
+            await self._send_page_album(user_id, image_paths, captions, parse_mode="Markdown")
 
             # update timestamps and page counter
-            self.db.update_last_sent(user_id)
-            self.db.set_current_page(user_id, page_number + pages_per_send)
+            await self.run_db(self.db.update_last_sent, user_id)
+            # only as far as the pages that were actually rendered and sent
+            next_page = page_number + len(image_paths)
+            await self.run_db(self.db.set_current_page, user_id, next_page)
 
-            # cleanup
-            pdf_reader.cleanup_images()
+            # no cleanup here - rendered pages live in pdf_reader.page_cache,
+            # which deletes files as it evicts them
 
             logger.info(f"sent {len(image_paths)} pages to user {user_id}")
 
+            # the next batch is predictable - render it now so the next send only uploads
+            self._start_prerender(user_id, next_page, pages_per_send)
+
         except Exception as e:
             print(f"ERROR in send_pages_to_user: {e}")  # quick debug print
             BotLogger.log_error(e, f"sending pages to user {user_id}")
@@ -583,96 +746,149 @@ class PDFSenderBot:
                     user_id, "❌ error sending pages. try again later"
                 )
 
-    async def check_and_send_pages(self):
-        """Check and send pages to users based on their personal settings"""
-        try:
-            # Get all users
-            users = self.db.get_users()
-            logger.info(f"Checking {len(users)} users for scheduled sends")
+    async def check_and_send_pages(self) -> Optional[datetime]:
+        """Check and send pages to users based on their personal settings
+
+        returns when the earliest of the checked users is due next (None if nobody is)
+        """
+        # the interval job and the early next-due run can fire together; the
+        # second one waits and then sees the first one's last_sent updates
+        async with self._check_lock:
+            return await self._check_and_send_pages()
 
+    async def _check_and_send_pages(self) -> Optional[datetime]:
+        """check_and_send_pages() without the lock"""
+        try:
             # Current time
             now = datetime.now()
 
-            # Check each user
-            for user in users:
+            # every user with a book: the ones sent recently aren't due, but their
+            # next send time still counts for when the scheduler wakes up next
+            users = self.db.get_scheduled_users()
+            logger.info(f"Checking {len(users)} users for scheduled sends")
+
+            # check users concurrently, at most SCHEDULER_CONCURRENCY at a time
+            limit = asyncio.Semaphore(SCHEDULER_CONCURRENCY)
+
+            async def process(user):
+                async with limit:
+                    return await self._process_scheduled_user(user, now)
+
+            # one user blowing up shouldnt cost everyone else their next due time
+            results = await asyncio.gather(
+                *(process(user) for user in users), return_exceptions=True
+            )
+            next_checks = []
+            for user, result in zip(users, results):
+                if isinstance(result, Exception):
+                    BotLogger.log_error(result, f"scheduled send for user {user.user_id}")
+                elif isinstance(result, BaseException):
+                    # cancellation / shutdown, not a failed send
+                    raise result
+                elif result is not None:
+                    next_checks.append(result)
+
+            # earliest moment any user is due again, so the scheduler can
+            # wake up then instead of waiting for the next regular tick
+            return min(next_checks, default=None)
+
+        except Exception as e:
+            logger.error(f"error in check_and_send_pages: {e}")
+            return None
+
+    async def _process_scheduled_user(self, user: UserState, now: datetime) -> Optional[datetime]:
+        """send the next pages to one user if their schedule says it's time
+
+        returns when this user should be checked again, None if they are off the schedule
+        """
+        user_id = user.user_id
+        if user_id is None:  # get_scheduled_users always fills it in
+            return None
+        next_check = None
+        try:
+            # get user settings
+            user_cfg = self.user_settings.get_user_settings(user_id)
+            
+            # skip if auto-send disabled
+            if not user_cfg["auto_send_enabled"]:
+                return None
+
+            # get schedule stuff
+            sched_time = user_cfg["schedule_time"]  
+            interval_hrs = user_cfg["interval_hours"]
+            pages_count = user_cfg["pages_per_send"]
+            
+            # check if time to send
+            should_send_now = False
+            
+            if sched_time and sched_time != "disabled":
+                # parse time format HH:MM
                 try:
-                    user_id = user["id"]
-                    
-                    # get user settings
-                    user_cfg = self.user_settings.get_user_settings(user_id)
-                    
-                    # skip if auto-send disabled
-                    if not user_cfg["auto_send_enabled"]:
-                        continue
-
-                    # check if user has pdf
-                    pdf_file = self.db.get_pdf_path(user_id)
-                    if not pdf_file or not os.path.exists(pdf_file):
-                        logger.info(f"user {user_id} has no pdf, skipping")
-                        continue
-
-                    # get schedule stuff
-                    sched_time = user_cfg["schedule_time"]  
-                    interval_hrs = user_cfg["interval_hours"]
-                    pages_count = user_cfg["pages_per_send"]
+                    hr, min = map(int, sched_time.split(":"))
+                    today_schedule = now.replace(hour=hr, minute=min, second=0, microsecond=0)
                     
-                    # check if time to send
-                    should_send_now = False
-                    
-                    if sched_time and sched_time != "disabled":
-                        # parse time format HH:MM
-                        try:
-                            hr, min = map(int, sched_time.split(":"))
-                            today_schedule = now.replace(hour=hr, minute=min, second=0, microsecond=0)
-                            
-                            # check if should send now
-                            last_send_time = self.db.get_last_sent(user_id)
-                            if not last_send_time:
-                                # never sent before, send if past schedule time
-                                should_send_now = now >= today_schedule
-                            else:
-                                # check if new day and past schedule time
-                                last_date = last_send_time.date()
-                                today = now.date()
-                                if today > last_date and now >= today_schedule:
-                                    should_send_now = True
-                        except ValueError:
-                            logger.warning(f"bad schedule time format for user {user_id}: {sched_time}")
+                    # check if should send now
+                    last_send_time = user.last_sent
+                    if not last_send_time:
+                        # never sent before, send if past schedule time
+                        should_send_now = now >= today_schedule
                     else:
-                        # use interval sending
-                        last_send_time = self.db.get_last_sent(user_id)
-                        if (
-                            not last_send_time
-                            or (now - last_send_time).total_seconds() >= interval_hrs * 3600
-                        ):
+                        # check if new day and past schedule time
+                        last_date = last_send_time.date()
+                        today = now.date()
+                        if today > last_date and now >= today_schedule:
                             should_send_now = True
-                    
-                    if should_send_now:
-                        # get current page
-                        curr_page = self.db.get_current_page(user_id)
-                        
-                        # check if book finished
-                        total_pgs = self.db.get_total_pages(user_id)
-                        if curr_page >= total_pgs:
-                            logger.info(f"user {user_id} finished book")
-                            continue
-
-                        # send the pages
-                        await self.send_pages_to_user(user_id, curr_page)
-                        logger.info(f"sent scheduled pages to user {user_id} (page {curr_page})")
+                    # later today if we havent reached the time yet, otherwise tomorrow
+                    if now < today_schedule:
+                        next_check = today_schedule
                     else:
-                        # log next send time - maybe too verbose but useful for debugging
-                        last_send_time = self.db.get_last_sent(user_id)
-                        if last_send_time and sched_time == "disabled":
-                            next_send = last_send_time + timedelta(hours=interval_hrs)
-                            time_left = next_send - now
-                            logger.debug(f"user {user_id}: next send in {time_left}")
-
-                except Exception as e:
-                    logger.error(f"error processing user {user_id}: {e}")
+                        next_check = today_schedule + timedelta(days=1)
+                except ValueError:
+                    logger.warning(f"bad schedule time format for user {user_id}: {sched_time}")
+            else:
+                # use interval sending
+                last_send_time = user.last_sent
+                if (
+                    not last_send_time
+                    or (now - last_send_time).total_seconds() >= interval_hrs * 3600
+                ):
+                    should_send_now = True
+                    next_check = now + timedelta(hours=interval_hrs)
+                else:
+                    next_check = last_send_time + timedelta(hours=interval_hrs)
+            
+            if should_send_now:
+                # check if user has pdf - only for users that are due, the
+                # rest just report their next send time
+                if not self.pdf_available(user.pdf_path):
+                    logger.info(f"user {user_id} has no pdf, skipping")
+                    return None
+
+                # get current page
+                curr_page = user.current_page
+                
+                # check if book finished
+                total_pgs = user.total_pages
+                if curr_page >= total_pgs:
+                    logger.info(f"user {user_id} finished book")
+                    return None
+
+                # send the pages
+                await self.send_pages_to_user(user_id, curr_page, state=user)
+                logger.info(f"sent scheduled pages to user {user_id} (page {curr_page})")
+            else:
+                # log next send time - maybe too verbose but useful for debugging
+                last_send_time = user.last_sent
+                if last_send_time and sched_time == "disabled":
+                    next_send = last_send_time + timedelta(hours=interval_hrs)
+                    time_left = next_send - now
+                    logger.debug(f"user {user_id}: next send in {time_left}")
 
         except Exception as e:
-            logger.error(f"error in check_and_send_pages: {e}")
+            logger.error(f"error processing user {user_id}: {e}")
+            return None
+
+        return next_check
 
     async def upload_command(self, message: types.Message, state: FSMContext):
         """handle /upload command"""
@@ -742,7 +958,7 @@ class PDFSenderBot:
 
             # validate and sanitize filename - probably overkill but whatever
             original_filename = message.document.file_name or "book.pdf"
-            is_valid_name, sanitized_filename = FileValidator.validate_file_name(
+            is_valid_name, sanitized_filename = FileValidator.default().validate_file_name(
                 original_filename
             )
 
@@ -771,8 +987,8 @@ class PDFSenderBot:
             await self.bot.download_file(file_path, local_file_path)
 
             # Validate the downloaded PDF
-            is_valid, validation_message = FileValidator.validate_pdf_file(
-                local_file_path, file_size
+            is_valid, validation_message = await asyncio.to_thread(
+                FileValidator.default().validate_pdf_file, local_file_path, file_size
             )
 
             if not is_valid:
@@ -787,11 +1003,12 @@ class PDFSenderBot:
                 BotLogger.log_error(Exception(validation_message), f"PDF validation failed for user {user_id}")
                 return
 
-            # Create a PDFReader instance to validate and set the PDF
-            pdf_reader = PDFReader(
-                user_id=user_id, output_dir=legacy_config.OUTPUT_DIR, db=self.db
-            )
-            success = pdf_reader.set_pdf_for_user(user_id, local_file_path)
+            # validate and set the PDF - the cached reader switches to the new file on
+            # success; not while a render of the old book is still using it
+            pdf_reader, render_lock = self._locked_reader(user_id)
+            async with render_lock:
+                success = await asyncio.to_thread(pdf_reader.set_pdf_for_user, user_id, local_file_path)
+            self._exists_cache.pop(local_file_path, None)
 
             if success:
                 total_pages = self.db.get_total_pages(user_id)
@@ -849,7 +1066,8 @@ class PDFSenderBot:
         BotLogger.log_user_action(user_id, username, "book_info_command")
 
         # Check if user exists
-        if not self.db.get_user(user_id):
+        state = self.db.get_user_state(user_id)
+        if not state.exists:
             await message.reply(
                 "❌ **Необходимо запустить бота**\n\n"
                 "Используйте команду /start",
@@ -859,8 +1077,8 @@ class PDFSenderBot:
             return
 
         # Check if user has a PDF
-        pdf_path = self.db.get_pdf_path(user_id)
-        if not pdf_path or not os.path.exists(pdf_path):
+        pdf_path = state.pdf_path
+        if not self.pdf_available(pdf_path):
             await message.reply(
                 "❌ **Книга не загружена**\n\n"
                 "Вы еще не загрузили книгу! "
@@ -872,8 +1090,8 @@ class PDFSenderBot:
 
         # Get book info
         filename = os.path.basename(pdf_path)
-        current_page = self.db.get_current_page(user_id)
-        total_pages = self.db.get_total_pages(user_id)
+        current_page = state.current_page
+        total_pages = state.total_pages
         progress = (current_page / total_pages * 100) if total_pages > 0 else 0
 
         # Format book info
@@ -1015,7 +1233,7 @@ class PDFSenderBot:
             stats_text += f"🏅 **Достижений:** {len(user_stats['achievements'])}/{len(self.db.get_available_achievements())}\n\n"
 
             # Current book progress
-            if pdf_path and os.path.exists(pdf_path):
+            if self.pdf_available(pdf_path):
                 current_page = self.db.get_current_page(user_id)
                 total_pages = self.db.get_total_pages(user_id)
                 progress = (current_page / total_pages) * 100 if total_pages > 0 else 0
@@ -1047,7 +1265,7 @@ class PDFSenderBot:
                         stats_text += "📈 **Аналитика чтения:**\n"
                         stats_text += f"⚡ **Темп:** {pages_per_day:.1f} стр/день\n"
                         
-                        if pdf_path and os.path.exists(pdf_path):
+                        if self.pdf_available(pdf_path):
                             current_page = self.db.get_current_page(user_id)
                             total_pages = self.db.get_total_pages(user_id)
                             if pages_per_day > 0 and total_pages > current_page:
@@ -1148,7 +1366,7 @@ class PDFSenderBot:
             
             for user in users:
                 pdf_path = user.get("pdf_path")
-                if pdf_path and os.path.exists(pdf_path):
+                if self.pdf_available(pdf_path):
                     active_users += 1
                 
                 user_settings = self.user_settings.get_user_settings(user["id"])
@@ -1200,7 +1418,6 @@ class PDFSenderBot:
 
         try:
             import psutil
-            from datetime import timedelta
             
             # System info
             cpu_percent = psutil.cpu_percent(interval=1)
@@ -1218,7 +1435,8 @@ class PDFSenderBot:
                     disk = type('DiskUsage', (), {'total': 0, 'used': 0, 'free': 0})()
             
             # Bot uptime (approximate)
-            uptime = datetime.now() - datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+            now = datetime.now()
+            uptime = now - now.replace(hour=0, minute=0, second=0, microsecond=0)
             
             # Storage stats
             storage_stats = CleanupManager.get_storage_usage()
@@ -1461,6 +1679,7 @@ class PDFSenderBot:
         finally:
             # Stop scheduler
             self.scheduler.stop()
+            self._render_pool.shutdown()
             await self.bot.session.close()
 
 
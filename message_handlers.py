@@ -98,7 +98,7 @@ class MessageHandler:
                 return
             
             # Update current page in database
-            self.bot.db.set_current_page(user_id, page_number)
+            await self.bot.run_db(self.bot.db.set_current_page, user_id, page_number)
             
             # Get data for display
             user_data = self.bot.db.get_user_data(user_id)
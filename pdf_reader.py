@@ -1,6 +1,17 @@
+import hashlib
 import logging
+import logging.handlers
+import multiprocessing
+import multiprocessing.queues
 import os
-from typing import List, Optional
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import Hashable, List, Optional, Tuple
+from uuid import uuid4
 
 import fitz as pymupdf  # mupdf bindings
 
@@ -10,6 +21,211 @@ from utils import clean_filename, get_file_size_mb  # some helper functions
 
 logger = logging.getLogger(__name__)
 
+# "page_5.png" (old renders) or "page_5_<digest>.jpg"
+PAGE_IMAGE_RE = re.compile(r"page_(\d+)(?:_[0-9a-f]+)?\.(?:png|jpg)")
+
+
+class PageImageCache:
+    """lru of rendered page images on disk, bounded by entry count and bytes
+
+    evicting an entry deletes its file, so the output dir can't outgrow the budget
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Tuple[str, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            path, size = entry
+            if not os.path.exists(path):
+                # the cleanup job got to it first
+                del self._entries[key]
+                self._bytes -= size
+                return None
+            self._entries.move_to_end(key)
+            return path
+
+    def put(self, key: Hashable, path: str) -> None:
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (path, size)
+            self._bytes += size
+            # always keep the newest entry, even if it alone is over budget
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                _, (old_path, old_size) = self._entries.popitem(last=False)
+                self._bytes -= old_size
+                try:
+                    os.remove(old_path)
+                except OSError:
+                    pass
+
+    def clear(self) -> None:
+        with self._lock:
+            for path, _ in self._entries.values():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._entries.clear()
+            self._bytes = 0
+
+
+page_cache = PageImageCache(
+    max_entries=get_config().page_cache_entries,
+    max_bytes=get_config().page_cache_size_mb * 1024 * 1024,
+)
+
+
+@lru_cache(maxsize=256)
+def _content_digest(pdf_path: str, mtime_ns: int, size: int) -> str:
+    """sha1 of the book's bytes, once per file version
+
+    the same book uploaded twice (or by two users) gets the same digest, so
+    they share rendered pages - and telegram file_ids, which are keyed by file name
+    """
+    digest = hashlib.sha1()
+    with open(pdf_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _render_page(pdf_path: str, page_number: int, dpi: int, quality: int, output_path: str) -> bool:
+    """rasterize one page to a jpeg, False if the page doesn't exist
+
+    module level so it can run in a worker process (see RenderPool)
+    """
+    doc = pymupdf.open(pdf_path)
+    try:
+        if page_number < 1 or page_number > len(doc):
+            logger.warning(f"Page {page_number} is out of range (1-{len(doc)})")
+            return False
+
+        page = doc.load_page(page_number - 1)  # pymupdf uses 0-based indexing
+        pix = page.get_pixmap(dpi=dpi)
+
+        # Save as JPEG with quality setting; written aside and renamed so a
+        # crash never leaves a half-written page under its final name. the
+        # temp name is per writer - users on the same book render the same file
+        part_path = f"{output_path}.{os.getpid()}.{uuid4().hex}.part"
+        pix.save(part_path, output="jpeg", jpg_quality=quality)
+        try:
+            os.replace(part_path, output_path)
+        except OSError:
+            try:
+                os.remove(part_path)
+            except OSError:
+                pass
+            # someone else's copy of the same page is just as good
+            if not os.path.exists(output_path):
+                raise
+        return True
+    finally:
+        doc.close()
+
+
+class _LogToParent(logging.Handler):
+    """hands records from render workers to the bot's own loggers"""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        logging.getLogger(record.name).handle(record)
+
+
+def _init_render_worker(log_queue) -> None:
+    """worker processes only queue their log records, the bot writes them"""
+    root = logging.getLogger()
+    root.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(logging.INFO)
+
+
+class RenderPool:
+    """worker processes for page rasterization, rebuilt when one dies
+
+    mupdf holds the GIL and isn't thread-safe, so pages render in processes.
+    a crash inside mupdf kills its worker and breaks the whole executor - it's
+    replaced on the next render instead of failing every render until restart.
+    workers are spawned, not forked: forking copies the logging/to_thread
+    threads' locks mid-use
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._context = multiprocessing.get_context("spawn")
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._log_queue: Optional[multiprocessing.queues.Queue] = None
+        self._log_listener: Optional[logging.handlers.QueueListener] = None
+
+    def _current(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                if self._log_listener is None:
+                    self._log_queue = self._context.Queue()
+                    self._log_listener = logging.handlers.QueueListener(
+                        self._log_queue, _LogToParent()
+                    )
+                    self._log_listener.start()
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=self._context,
+                    initializer=_init_render_worker,
+                    initargs=(self._log_queue,),
+                )
+            return self._executor
+
+    def _discard(self, executor: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def run(self, fn, *args):
+        """fn(*args) in a worker; one retry on a fresh pool if the old one broke"""
+        for attempt in range(2):
+            executor = self._current()
+            try:
+                return executor.submit(fn, *args).result()
+            except BrokenProcessPool:
+                logger.warning("render worker died, starting a new pool")
+                self._discard(executor)
+                if attempt:
+                    raise
+
+    def shutdown(self) -> None:
+        """stop the workers without waiting for renders in flight"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            listener, self._log_listener = self._log_listener, None
+        # a worker's last records can still sit in its queue feeder; they'd land
+        # after the listener's stop sentinel and get dropped, so the listener
+        # stops once the workers are gone - waited for off this thread
+        threading.Thread(target=self._stop, args=(executor, listener), daemon=True).start()
+
+    @staticmethod
+    def _stop(executor, listener) -> None:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        if listener is not None:
+            listener.stop()
+
 
 class PDFReader:
     def __init__(
@@ -18,9 +234,12 @@ class PDFReader:
         pdf_path: Optional[str] = None,
         output_dir: Optional[str] = None,
         db: Optional[DatabaseManager] = None,
+        render_pool: Optional[RenderPool] = None,
     ):
         self.db = db or DatabaseManager(get_config().database_path)
         self.user_id = user_id
+        # where mupdf rasterizes pages; None renders in the calling thread
+        self.render_pool = render_pool
 
         # if user_id provided, get pdf path from db
         if user_id is not None:
@@ -38,6 +257,9 @@ class PDFReader:
         else:
             self.output_dir = output_dir or get_config().output_dir
 
+        # ((path, mtime, size), page count) - saves reopening the book on every render
+        self._page_count: Optional[Tuple[tuple, int]] = None
+
         self._ensure_output_dir()
 
     def _ensure_output_dir(self):
@@ -51,6 +273,11 @@ class PDFReader:
             return 0
 
         try:
+            st = os.stat(self.pdf_path)
+            stamp = (self.pdf_path, st.st_mtime_ns, st.st_size)
+            if self._page_count is not None and self._page_count[0] == stamp:
+                return self._page_count[1]
+
             doc = pymupdf.open(self.pdf_path)
             total_pages = len(doc)
             doc.close()
@@ -58,6 +285,7 @@ class PDFReader:
             # Update database with total pages if user_id is provided
             if self.user_id is not None:
                 self.db.set_total_pages(self.user_id, total_pages)
+            self._page_count = (stamp, total_pages)
             return total_pages
         except Exception as e:
             logger.error(f"Error reading PDF: {e}")
@@ -70,24 +298,35 @@ class PDFReader:
             return None
 
         try:
-            doc = pymupdf.open(self.pdf_path)
-
-            if page_number < 1 or page_number > len(doc):
-                doc.close()
-                logger.warning(f"Page {page_number} is out of range (1-{len(doc)})")
+            # same book contents + same page + same settings -> same image, skip mupdf
+            quality = get_config().image_quality
+            st = os.stat(self.pdf_path)
+            book = _content_digest(os.path.abspath(self.pdf_path), st.st_mtime_ns, st.st_size)
+            key = (book, page_number, dpi, quality)
+            cached = page_cache.get(key)
+            if cached:
+                logger.debug(f"Page {page_number} served from cache: {cached}")
+                return cached
+
+            # Use JPEG format with configurable quality for smaller file sizes.
+            # the key digest keeps files from different books apart in a shared
+            # output dir, and makes the name the same across restarts
+            digest = hashlib.blake2s(repr(key).encode(), digest_size=6).hexdigest()
+            output_path = os.path.join(self.output_dir, f"page_{page_number}_{digest}.jpg")
+            if os.path.exists(output_path):
+                # rendered before the cache was (re)built, e.g. by a previous run
+                page_cache.put(key, output_path)
+                return output_path
+
+            args = (self.pdf_path, page_number, dpi, quality, output_path)
+            if self.render_pool is not None:
+                rendered = self.render_pool.run(_render_page, *args)
+            else:
+                rendered = _render_page(*args)
+            if not rendered:
                 return None
 
-            page = doc.load_page(page_number - 1)  # pymupdf uses 0-based indexing
-            pix = page.get_pixmap(dpi=dpi)
-
-            # Use JPEG format with configurable quality for smaller file sizes
-            timestamp = int(page_number)  # Use page number as identifier
-            output_path = os.path.join(self.output_dir, f"page_{timestamp}.jpg")
-
-            # Save as JPEG with quality setting
-            pix.save(output_path, jpg_quality=get_config().image_quality)
-
-            doc.close()
+            page_cache.put(key, output_path)
             logger.debug(f"Extracted page {page_number} to {output_path}")
             return output_path
         except Exception as e:
@@ -111,10 +350,12 @@ class PDFReader:
                 break
 
             image_path = self.extract_page_as_image(page_number, dpi)
-            if image_path:
-                image_paths.append(image_path)
-            else:
+            if not image_path:
+                # stop here so callers can move the bookmark by len(image_paths)
+                # without jumping over the missing page
                 logger.warning(f"Could not extract page {page_number}")
+                break
+            image_paths.append(image_path)
 
         return image_paths
 
@@ -156,22 +397,10 @@ class PDFReader:
         # Get all page image files (both PNG and JPEG)
         image_files = []
         for filename in os.listdir(self.output_dir):
-            if filename.startswith("page_") and (
-                filename.endswith(".png") or filename.endswith(".jpg")
-            ):
+            match = PAGE_IMAGE_RE.fullmatch(filename)
+            if match:
                 filepath = os.path.join(self.output_dir, filename)
-                # Extract page number from filename
-                try:
-                    # Remove extension and "page_" prefix
-                    name_part = filename.replace("page_", "")
-                    for ext in [".png", ".jpg"]:
-                        if name_part.endswith(ext):
-                            name_part = name_part.replace(ext, "")
-                            break
-                    page_num = int(name_part)
-                    image_files.append((page_num, filepath))
-                except ValueError:
-                    continue
+                image_files.append((int(match.group(1)), filepath))
 
         # Sort by page number and keep only the latest ones
         image_files.sort(key=lambda x: x[0], reverse=True)
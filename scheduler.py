@@ -1,6 +1,7 @@
 import logging
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.date import DateTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 
 from config import get_config
@@ -56,11 +57,36 @@ class PDFScheduler:
         """Job function to check and send pages based on interval"""
         try:
             logger.info("Starting interval pages job")
-            await self.bot.check_and_send_pages()
+            next_due = await self.bot.check_and_send_pages()
+            if next_due is not None:
+                self._schedule_next_due(next_due)
             logger.info("Interval pages job completed")
         except Exception as e:
             logger.error(f"Error in interval pages job: {e}")
 
+    def _schedule_next_due(self, when):
+        """run the pages job once more at `when` if that's before the regular tick
+
+        the interval job stays as the safety net, this just avoids making a user
+        who is due in 10 minutes wait for the next interval
+        """
+        # the regular tick or an early run already pending comes first - keep it,
+        # it will schedule the run after it
+        for job_id in ("interval_pages", "next_due_pages"):
+            job = self.scheduler.get_job(job_id)
+            if job is not None and job.next_run_time is not None:
+                if job.next_run_time.timestamp() <= when.timestamp():
+                    return
+
+        self.scheduler.add_job(
+            self._check_and_send_pages_job,
+            DateTrigger(run_date=when),
+            id="next_due_pages",
+            name="Send PDF Pages To The Next Due User",
+            replace_existing=True,
+        )
+        logger.debug(f"Next user due at {when}, scheduled an early run")
+
     async def _cleanup_job(self):
         """Job function to perform daily cleanup"""
         try:
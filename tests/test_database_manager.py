@@ -1,10 +1,14 @@
 import json
 import os
 import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from unittest.mock import patch
 
 import pytest
 
-from database_manager import DatabaseManager
+from database_manager import DatabaseManager, PageFileIdStore, UserState
 
 
 class TestDatabaseManager:
@@ -78,6 +82,11 @@ class TestDatabaseManager:
         assert new_page == initial_page + 3
         assert db_manager.get_current_page(user_id) == new_page
 
+    def test_increment_page_for_unknown_user(self, db_manager):
+        """Test that incrementing creates the user starting from page 1"""
+        assert db_manager.increment_page(777, 2) == 3
+        assert db_manager.get_current_page(777) == 3
+
     def test_get_set_total_pages(self, db_manager):
         """Test getting and setting total pages for a user"""
         user_id = 123
@@ -146,3 +155,243 @@ class TestDatabaseManager:
         # Now, verify the user has been saved to the database
         users_after = db_manager.get_users()
         assert any(u['id'] == user_id for u in users_after), "User was not saved to the database"
+
+    def test_load_data_reuses_parsed_copy_until_file_changes(self, db_manager):
+        """Test that load_data only re-parses the file after it was modified"""
+        first = db_manager.load_data()
+        assert db_manager.load_data() is first
+
+        # simulate another process writing the file
+        with open(db_manager.db_path, "w", encoding="utf-8") as f:
+            json.dump({"users": [{"id": 1, "username": "other"}]}, f)
+        os.utime(db_manager.db_path, ns=(0, 0))
+
+        reloaded = db_manager.load_data()
+        assert reloaded is not first
+        assert reloaded["users"][0]["username"] == "other"
+
+    def test_get_user_uses_cache_and_cache_clear_reloads(self, db_manager):
+        """Test that repeated lookups hit the user cache and cache_clear drops it"""
+        db_manager.add_user(12345, "test_user")
+        user = db_manager.get_user(12345)
+        assert db_manager.get_user(12345) is user
+        assert 12345 in db_manager._user_cache
+
+        db_manager.cache_clear()
+        assert not db_manager._user_cache
+        assert db_manager.get_user(12345) is not user
+        assert db_manager.get_user(12345)["username"] == "test_user"
+
+    def test_unlock_achievements_in_single_pass(self, tmp_path):
+        """Test that several achievements are unlocked with one points update"""
+        db_manager = DatabaseManager(str(tmp_path / "db.json"))
+        db_manager.add_user(12345, "test_user")
+
+        with patch.object(db_manager, "add_points", wraps=db_manager.add_points) as add_points:
+            unlocked = db_manager._unlock_achievements(12345, ["first_page", "page_10", "first_page", "unknown"])
+
+        assert unlocked == ["first_page", "page_10"]
+        add_points.assert_called_once()
+        user = db_manager.get_user(12345)
+        assert user["achievements"] == ["first_page", "page_10"]
+        assert user["total_points"] == 60
+
+        # already owned achievements are not awarded twice
+        assert db_manager._unlock_achievements(12345, ["first_page"]) == []
+        assert db_manager.get_user(12345)["total_points"] == 60
+
+    def test_get_leaderboard_returns_top_users_in_order(self, db_manager):
+        """Test that the leaderboard keeps only the top users sorted by points"""
+        for user_id, points in [(1, 30), (2, 100), (3, 0), (4, 70)]:
+            db_manager.add_user(user_id, f"user{user_id}")
+            db_manager.add_points(user_id, points)
+
+        leaderboard = db_manager.get_leaderboard(limit=2)
+        assert [row["username"] for row in leaderboard] == ["user2", "user4"]
+        assert [row["rank"] for row in leaderboard] == [1, 2]
+
+    def test_existing_db_gets_missing_default_achievements(self, db_manager):
+        """Test that an existing db without achievements is backfilled once"""
+        achievements = db_manager.get_available_achievements()
+        assert len(achievements) == 10
+
+        with patch.object(db_manager, "save_data") as save_data:
+            db_manager._ensure_database_exists()
+        save_data.assert_not_called()
+
+    def test_add_reading_sessions_saves_once(self, db_manager):
+        """Test that a batch of sessions is written with one save"""
+        with patch.object(db_manager, "save_data", wraps=db_manager.save_data) as save_data:
+            db_manager.add_reading_sessions([(1, 5, 10), (2, 3, 7), (1, 2, 4)])
+
+        save_data.assert_called_once()
+        sessions = db_manager.load_data()["reading_sessions"]
+        assert [(s["user_id"], s["pages_read"], s["points_earned"]) for s in sessions] == [
+            (1, 5, 25),
+            (2, 3, 15),
+            (1, 2, 10),
+        ]
+
+    def test_check_achievements_unlocks_reached_thresholds(self, tmp_path):
+        """Test that every page/streak threshold reached is unlocked"""
+        db_manager = DatabaseManager(str(tmp_path / "db.json"))
+        user = db_manager.get_user_data(12345)
+        user["pages_read"] = 50
+        user["current_streak"] = 7
+
+        with patch("database_manager.datetime") as mock_datetime:
+            mock_datetime.now.return_value.hour = 12
+            db_manager._check_achievements(12345)
+
+        assert db_manager.get_user(12345)["achievements"] == [
+            "first_page",
+            "page_10",
+            "page_50",
+            "daily_streak_7",
+        ]
+
+    def test_get_user_stats_resolves_achievements(self, tmp_path):
+        """Test that stats include the full achievement entries the user owns"""
+        db_manager = DatabaseManager(str(tmp_path / "db.json"))
+        db_manager.add_user(12345, "test_user")
+        db_manager._unlock_achievements(12345, ["page_10", "first_page"])
+
+        stats = db_manager.get_user_stats(12345)
+        assert [a["id"] for a in stats["achievements"]] == ["page_10", "first_page"]
+        assert stats["total_points"] == 60
+        assert stats["next_level_exp"] == 40
+
+    def test_ensure_database_fills_missing_keys_with_one_write(self, tmp_path):
+        """Test that an old db file is upgraded with a single save"""
+        db_path = tmp_path / "old.json"
+        db_path.write_text(json.dumps({"users": []}), encoding="utf-8")
+
+        with patch.object(DatabaseManager, "save_data", autospec=True,
+                          side_effect=DatabaseManager.save_data) as save_data:
+            db_manager = DatabaseManager(str(db_path))
+
+        save_data.assert_called_once()
+        data = db_manager.load_data()
+        assert set(data) == {"users", "leaderboard", "achievements", "reading_sessions"}
+        assert len(data["achievements"]) == 10
+
+    def test_page_file_ids_persist(self, tmp_path):
+        """Test that stored telegram file_ids survive a fresh manager"""
+        db_path = str(tmp_path / "db.json")
+        DatabaseManager(db_path).set_page_file_id("page_5_abc.jpg", "AgAD-file-id")
+
+        db_manager = DatabaseManager(db_path)
+        assert db_manager.get_page_file_id("page_5_abc.jpg") == "AgAD-file-id"
+        assert db_manager.get_page_file_id("page_6_abc.jpg") is None
+
+    def test_page_file_ids_stay_out_of_db_file(self, tmp_path):
+        """Test that file_ids go to their own file and old inline ones move there"""
+        db_path = tmp_path / "db.json"
+        db_path.write_text(json.dumps({"users": [], "page_file_ids": {"page_1_abc.jpg": "old-id"}}))
+
+        db_manager = DatabaseManager(str(db_path))
+        db_manager.set_page_file_id("page_2_abc.jpg", "new-id")
+
+        assert "page_file_ids" not in json.loads(db_path.read_text())
+        fresh = DatabaseManager(str(db_path))
+        assert fresh.get_page_file_id("page_1_abc.jpg") == "old-id"
+        assert fresh.get_page_file_id("page_2_abc.jpg") == "new-id"
+
+    def test_page_file_id_store_drops_oldest(self, tmp_path):
+        """Test that the store keeps the newest ids and compacts its file"""
+        path = str(tmp_path / "ids.jsonl")
+        store = PageFileIdStore(path, limit=3)
+        for n in range(10):
+            store.update({f"page_{n}.jpg": f"id-{n}"})
+
+        reloaded = PageFileIdStore(path, limit=3)
+        assert [reloaded.get(f"page_{n}.jpg") for n in range(6, 10)] == [None, "id-7", "id-8", "id-9"]
+        with open(path, encoding="utf-8") as file:
+            assert len(file.readlines()) <= 6
+
+    def test_get_user_state(self, tmp_path):
+        """Test that the handler state comes from one record and doesn't create users"""
+        db_manager = DatabaseManager(str(tmp_path / "db.json"))
+        assert db_manager.get_user_state(12345) == UserState(exists=False)
+        assert db_manager.get_user(12345) is None
+
+        db_manager.add_user(12345, "test_user", pdf_path="book.pdf", current_page=7, total_pages=70)
+        db_manager.update_last_sent(12345)
+
+        state = db_manager.get_user_state(12345)
+        assert state.exists
+        assert (state.pdf_path, state.current_page, state.total_pages) == ("book.pdf", 7, 70)
+        assert state.username == "test_user"
+        assert state.last_sent == db_manager.get_last_sent(12345)
+
+    def test_get_scheduled_users(self, tmp_path):
+        """Test that every user with a book is returned, sent recently or not"""
+        db_manager = DatabaseManager(str(tmp_path / "db.json"))
+        db_manager.add_user(1, "never_sent", pdf_path="a.pdf")
+        db_manager.add_user(2, "sent_recently", pdf_path="b.pdf")
+        db_manager.add_user(3, "no_book", pdf_path="c.pdf")
+        db_manager.update_last_sent(2)
+        data = db_manager.load_data()
+        db_manager._find_user(data, 3)["pdf_path"] = None
+        db_manager.save_data(data)
+
+        users = db_manager.get_scheduled_users()
+
+        assert [state.user_id for state in users] == [1, 2]
+        assert users[0].pdf_path == "a.pdf"
+        assert users[0].last_sent is None
+        assert users[1].last_sent == db_manager.get_last_sent(2)
+
+    def test_save_data_replaces_file_atomically(self, tmp_path):
+        """Test that saving goes through a temp file that doesn't stay behind"""
+        db_path = tmp_path / "db.json"
+        db_manager = DatabaseManager(str(db_path))
+        db_manager.add_user(12345, "test_user")
+
+        with patch("database_manager.os.replace", wraps=os.replace) as mock_replace:
+            db_manager.set_current_page(12345, 42)
+
+        mock_replace.assert_called_once_with(f"{db_path}.tmp", str(db_path))
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["db.json"]
+        assert DatabaseManager(str(db_path)).get_current_page(12345) == 42
+
+    def test_reads_dont_wait_for_file_write(self, tmp_path):
+        """Test that a read during a slow disk write returns the new data right away"""
+        db_manager = DatabaseManager(str(tmp_path / "db.json"))
+        db_manager.add_user(12345, "test_user")
+        writing = threading.Event()
+        release = threading.Event()
+        real_replace = os.replace
+
+        def slow_replace(src, dst):
+            writing.set()
+            release.wait(5)
+            real_replace(src, dst)
+
+        with patch("database_manager.os.replace", side_effect=slow_replace):
+            writer = threading.Thread(target=db_manager.set_current_page, args=(12345, 9))
+            writer.start()
+            assert writing.wait(5)
+            try:
+                with ThreadPoolExecutor(max_workers=1) as pool:
+                    state = pool.submit(db_manager.get_user_state, 12345).result(timeout=1)
+            finally:
+                release.set()
+                writer.join()
+
+        assert state.current_page == 9
+        assert DatabaseManager(str(tmp_path / "db.json")).get_current_page(12345) == 9
+
+    def test_concurrent_user_creation_makes_one_record(self, tmp_path):
+        """Test that racing get_user_data/add_user calls don't duplicate a user"""
+        db_manager = DatabaseManager(str(tmp_path / "db.json"))
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            for i in range(40):
+                if i % 2:
+                    pool.submit(db_manager.get_user_data, 777)
+                else:
+                    pool.submit(db_manager.add_user, 777, "racer")
+
+        users = DatabaseManager(str(tmp_path / "db.json")).get_users()
+        assert [u["id"] for u in users] == [777]
@@ -9,7 +9,7 @@ from unittest.mock import Mock, patch
 
 import fitz as pymupdf
 
-from file_validator import FileValidator
+from file_validator import ERR_NOT_FOUND, FileValidator
 
 
 class TestFileValidator(unittest.TestCase):
@@ -62,6 +62,12 @@ class TestFileValidator(unittest.TestCase):
         self.assertFalse(is_valid)
         self.assertEqual(message, "File not found")
 
+    def test_validate_pdf_file_returns_shared_result(self):
+        """Test that rejections are the module-level result constants"""
+        result = self.validator.validate_pdf_file("nonexistent.pdf")
+
+        self.assertIs(result, ERR_NOT_FOUND)
+
     def test_validate_pdf_file_too_large(self):
         """Test validation when file is too large"""
         pdf_path = self.create_mock_pdf("large.pdf", pages=10)  # Create a PDF
@@ -100,25 +106,23 @@ class TestFileValidator(unittest.TestCase):
     def test_validate_pdf_file_too_many_pages(self):
         """Test validation of PDF with too many pages"""
         # Mock the PDF to appear to have too many pages
-        with patch("file_validator.os.path.exists", return_value=True), patch(
-            "file_validator.os.path.getsize", return_value=1024
-        ), patch(
-            "file_validator.mimetypes.guess_type",
-            return_value=("application/pdf", None),
-        ), patch(
-            "file_validator.pymupdf.open"
-        ) as mock_open:
+        fake_pdf = os.path.join(self.temp_dir, "fake.pdf")
+        with open(fake_pdf, "wb") as f:
+            f.write(b"%PDF-1.7\nstartxref\n0\n%%EOF\n")
+
+        with patch("fitz.open") as mock_open:
 
             mock_doc = Mock()
-            mock_doc.__len__ = Mock(return_value=15000)  # Use Mock() for __len__
+            mock_doc.page_count = 15000
             mock_doc.needs_pass = False
             mock_doc.close = Mock()
             mock_open.return_value = mock_doc
 
-            is_valid, message = self.validator.validate_pdf_file("fake.pdf")
+            is_valid, message = self.validator.validate_pdf_file(fake_pdf)
 
             self.assertFalse(is_valid)
             self.assertEqual(message, "PDF has too many pages (maximum: 10,000)")
+            mock_doc.close.assert_called_once()
 
     def test_validate_pdf_file_corrupted(self):
         """Test validation of corrupted PDF"""
@@ -132,6 +136,65 @@ class TestFileValidator(unittest.TestCase):
         self.assertFalse(is_valid)
         self.assertEqual(message, "Invalid or corrupted PDF file")
 
+    def test_validate_pdf_file_truncated(self):
+        """Test that a PDF cut off before its trailer is rejected without MuPDF"""
+        pdf_path = self.create_mock_pdf("truncated.pdf")
+        with open(pdf_path, "rb") as f:
+            data = f.read()
+        with open(pdf_path, "wb") as f:
+            f.write(data[: len(data) // 2])
+
+        with patch("fitz.open") as mock_open:
+            is_valid, message = self.validator.validate_pdf_file(pdf_path)
+
+        mock_open.assert_not_called()
+        self.assertFalse(is_valid)
+        self.assertEqual(message, "Invalid or corrupted PDF file")
+
+    def test_validate_pdf_file_wrong_type(self):
+        """Test that non-PDF content with another extension is rejected by type"""
+        text_file = os.path.join(self.temp_dir, "notes.txt")
+        with open(text_file, "w") as f:
+            f.write("just some notes")
+
+        is_valid, message = self.validator.validate_pdf_file(text_file)
+
+        self.assertFalse(is_valid)
+        self.assertEqual(message, "Invalid file type. Only PDF files are supported")
+
+    def test_validate_pdf_file_header_checked_before_size(self):
+        """Test that a non-PDF is rejected by type even when it is too large"""
+        text_file = os.path.join(self.temp_dir, "huge.txt")
+        with open(text_file, "w") as f:
+            f.write("not a pdf")
+
+        too_large = self.validator.config.max_file_size + 1
+        is_valid, message = self.validator.validate_pdf_file(text_file, too_large)
+
+        self.assertFalse(is_valid)
+        self.assertEqual(message, "Invalid file type. Only PDF files are supported")
+
+    def test_validate_pdf_file_cached_until_file_changes(self):
+        """Test that an unchanged file is not re-opened with MuPDF"""
+        pdf_path = self.create_mock_pdf("cached.pdf")
+
+        with patch("fitz.open", wraps=pymupdf.open) as mock_open:
+            self.assertTrue(self.validator.validate_pdf_file(pdf_path)[0])
+            self.assertTrue(self.validator.validate_pdf_file(pdf_path)[0])
+            # opened by path, the file isn't read into memory first
+            mock_open.assert_called_once_with(pdf_path, filetype="pdf")
+
+        # rewriting the file changes size/mtime and forces a new check
+        self.create_mock_pdf("cached.pdf", pages=2)
+        os.utime(pdf_path, ns=(0, 0))
+        with patch("fitz.open", wraps=pymupdf.open) as mock_open:
+            self.assertTrue(self.validator.validate_pdf_file(pdf_path)[0])
+            self.assertEqual(mock_open.call_count, 1)
+
+    def test_default_returns_shared_instance(self):
+        """Test that default() hands out one shared validator"""
+        self.assertIs(FileValidator.default(), FileValidator.default())
+
     def test_validate_file_name_valid(self):
         """Test filename validation with valid name"""
         is_valid, sanitized = self.validator.validate_file_name("book.pdf")
@@ -157,6 +220,13 @@ class TestFileValidator(unittest.TestCase):
             sanitized, "passwd.pdf"
         )  # os.path.basename removes path components
 
+    def test_validate_file_name_keeps_unicode_letters(self):
+        """Test that non-latin letters survive sanitization"""
+        is_valid, sanitized = self.validator.validate_file_name("Моя книга (2).pdf")
+
+        self.assertTrue(is_valid)
+        self.assertEqual(sanitized, "Моякнига2.pdf")
+
     def test_validate_file_name_empty(self):
         """Test filename validation with empty name"""
         is_valid, sanitized = self.validator.validate_file_name("")
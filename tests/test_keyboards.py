@@ -0,0 +1,71 @@
+import sys
+
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+
+from keyboards import MAIN_MENU, SETTINGS_MENU, BotKeyboards
+
+
+class TestBotKeyboards:
+    def test_static_menus_are_cached(self):
+        """Test that static menus are built once and reused"""
+        assert BotKeyboards.main_menu() is BotKeyboards.main_menu()
+        assert BotKeyboards.schedule_time_menu() is BotKeyboards.schedule_time_menu()
+
+    def test_static_menus_are_module_constants(self):
+        """Test that the class methods return the exported constants"""
+        assert BotKeyboards.main_menu() is MAIN_MENU
+        assert BotKeyboards.settings_menu() is SETTINGS_MENU
+
+    def test_markup_matches_builder_layout(self):
+        """Test that prebuilt markups serialize like the builder ones did"""
+        builder = InlineKeyboardBuilder()
+        for i in range(1, 11):
+            builder.add(InlineKeyboardButton(text=str(i), callback_data=f"pps_{i}"))
+        builder.adjust(5, 5)
+        builder.row(InlineKeyboardButton(text="🔙 Back to settings", callback_data="settings_menu"))
+
+        markup = BotKeyboards.pages_per_send_menu()
+        assert isinstance(markup, InlineKeyboardMarkup)
+        assert markup.model_dump(exclude_none=True) == builder.as_markup().model_dump(exclude_none=True)
+
+    def test_navigation_menu_layout(self):
+        """Test navigation buttons for first, middle and last page"""
+        first = BotKeyboards.navigation_menu(1, 5).inline_keyboard
+        assert [b.callback_data for b in first[0]] == ["current_page_info", "gp_2"]
+        assert [b.callback_data for b in first[1]] == ["gp_5"]
+
+        middle = BotKeyboards.navigation_menu(3, 5).inline_keyboard
+        assert [b.callback_data for b in middle[0]] == ["gp_1", "gp_2", "current_page_info"]
+        assert [b.callback_data for b in middle[1]] == ["gp_4", "gp_5"]
+
+        last = BotKeyboards.navigation_menu(5, 5).inline_keyboard
+        assert [b.callback_data for b in last[0]] == ["gp_1", "gp_4"]
+        assert last[-1][0].callback_data == "main_menu"
+
+    def test_navigation_menu_cache(self):
+        """Test that navigation markups are reused per (page, total) pair"""
+        first = BotKeyboards.navigation_menu(7, 300)
+        assert BotKeyboards.navigation_menu(7, 300) is first
+        assert BotKeyboards.navigation_menu(8, 300) is not first
+
+    def test_unvalidated_markups_round_trip(self):
+        """Test that model_construct markups serialize like validated ones"""
+        for markup in (
+            BotKeyboards.navigation_menu(3, 5),
+            BotKeyboards.confirmation_menu("reset"),
+            BotKeyboards.toggle_button("notifications", True),
+            BotKeyboards.reading_progress_menu(2, 10),
+        ):
+            validated = InlineKeyboardMarkup.model_validate(markup.model_dump())
+            assert markup.model_dump_json(exclude_none=True) == validated.model_dump_json(exclude_none=True)
+
+    def test_back_buttons_are_shared(self):
+        """Test that menus reuse one instance of each back button"""
+        assert BotKeyboards.leaderboard_menu().inline_keyboard[-1][0] is BotKeyboards.stats_menu().inline_keyboard[-1][0]
+        assert BotKeyboards.system_menu().inline_keyboard[-1][0] is BotKeyboards.logs_menu().inline_keyboard[-1][0]
+
+    def test_callback_data_is_interned(self):
+        """Test that equal callback strings share one object across menus"""
+        first = BotKeyboards.schedule_time_menu().inline_keyboard[0][0].callback_data
+        assert first is sys.intern("st_06:00")
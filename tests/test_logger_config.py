@@ -0,0 +1,99 @@
+"""
+Tests for logging configuration helpers
+"""
+
+import logging
+
+from logger_config import BotLogger, JsonFormatter, init_logging
+
+
+def _record(message: str, level: int = logging.INFO) -> logging.LogRecord:
+    return logging.LogRecord("bot", level, __file__, 1, message, None, None)
+
+
+class TestBotLogger:
+    def test_json_lines_round_trip(self, tmp_path, monkeypatch):
+        """Test that JSON log lines are read back with the same fields"""
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "logs").mkdir()
+        formatter = JsonFormatter(datefmt="%Y-%m-%d %H:%M:%S")
+        lines = [
+            formatter.format(_record("plain")),
+            formatter.format(_record("has - dashes - inside", logging.ERROR)),
+        ]
+        (tmp_path / "logs" / "bot.log").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+        logs = BotLogger.get_recent_logs(10)
+
+        assert [log["message"] for log in logs] == ["plain", "has - dashes - inside"]
+        assert [log["level"] for log in logs] == ["INFO", "ERROR"]
+        assert logs[0]["name"] == "bot"
+
+    def test_legacy_text_lines_still_parse(self, tmp_path, monkeypatch):
+        """Test that lines in the old text format are still understood"""
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "logs").mkdir()
+        (tmp_path / "logs" / "bot.log").write_text(
+            "2024-01-01 10:00:00 - root - WARNING - disk almost full\n", encoding="utf-8"
+        )
+
+        logs = BotLogger.get_recent_logs(10)
+
+        assert logs == [{
+            "timestamp": "2024-01-01 10:00:00",
+            "name": "root",
+            "level": "WARNING",
+            "message": "disk almost full",
+        }]
+
+    def test_recent_logs_reads_only_the_tail(self, tmp_path, monkeypatch):
+        """Test that the last lines come back in order from a large file"""
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "logs").mkdir()
+        formatter = JsonFormatter()
+        lines = [formatter.format(_record(f"line {i}")) for i in range(2000)]
+        (tmp_path / "logs" / "bot.log").write_text("\n".join(lines) + "\n\n", encoding="utf-8")
+
+        logs = BotLogger.get_recent_logs(50)
+
+        assert [log["message"] for log in logs] == [f"line {i}" for i in range(1950, 2000)]
+
+    def test_clear_logs_removes_only_log_files(self, tmp_path, monkeypatch):
+        """Test that clear_logs deletes current and rotated logs only"""
+        monkeypatch.chdir(tmp_path)
+        log_dir = tmp_path / "logs"
+        log_dir.mkdir()
+        for name in ("bot.log", "bot.log.1", "errors.log", "notes.txt"):
+            (log_dir / name).write_text("x")
+
+        BotLogger.clear_logs()
+
+        assert sorted(p.name for p in log_dir.iterdir()) == ["notes.txt"]
+
+    def test_logs_by_level_scans_past_other_levels(self, tmp_path, monkeypatch):
+        """Test that rare levels are found even behind many other lines"""
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "logs").mkdir()
+        formatter = JsonFormatter()
+        lines = [formatter.format(_record("old error", logging.ERROR))]
+        lines += [formatter.format(_record(f"info {i}")) for i in range(500)]
+        lines += [formatter.format(_record("new error", logging.ERROR))]
+        (tmp_path / "logs" / "bot.log").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+        logs = BotLogger.get_logs_by_level("error", 5)
+
+        assert [log["message"] for log in logs] == ["old error", "new error"]
+
+    def test_setup_logging_is_idempotent(self, tmp_path, monkeypatch):
+        """Test that a second init_logging() does not stack handlers"""
+        monkeypatch.chdir(tmp_path)
+        root = logging.getLogger()
+        monkeypatch.setattr(root, "handlers", list(root.handlers))
+        monkeypatch.setattr(root, "level", root.level)
+        monkeypatch.setattr(root, "_bot_configured", False, raising=False)
+
+        init_logging()
+        handlers = list(root.handlers)
+        init_logging()
+
+        assert root.handlers == handlers
@@ -1,8 +1,14 @@
-from unittest.mock import AsyncMock, Mock, patch
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, Mock, call, patch
 
 import pytest
 from aiogram import types
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.filters import CommandObject
+from aiogram.types import FSInputFile
 
+from database_manager import UserState
 from main import PDFSenderBot
 
 
@@ -64,6 +70,17 @@ class TestPDFSenderBot:
 
             mock_bot.return_value = mock_bot_instance
             mock_dp.return_value = mock_dp_instance
+            # handlers read one UserState; build it from the per-field mocks
+            # so tests can keep setting get_user/get_pdf_path/... directly
+            mock_db_instance.get_user_state.side_effect = lambda user_id: UserState(
+                exists=bool(mock_db_instance.get_user(user_id)),
+                pdf_path=mock_db_instance.get_pdf_path(user_id),
+                current_page=mock_db_instance.get_current_page(user_id),
+                total_pages=mock_db_instance.get_total_pages(user_id),
+                last_sent=mock_db_instance.get_last_sent(user_id),
+                user_id=user_id,
+                username=(mock_db_instance.get_user(user_id) or {}).get("username"),
+            )
             mock_db.return_value = mock_db_instance
             mock_pdf_reader.return_value = mock_pdf_reader_instance
             mock_scheduler.return_value = mock_scheduler_instance
@@ -332,26 +349,47 @@ class TestPDFSenderBot:
         ]
         mock_dependencies["pdf_reader"].cleanup_images.return_value = None
 
+        mock_dependencies["pdf_reader"].get_total_pages.return_value = 100
+
         # Setup mock database returns
         mock_dependencies["db"].get_total_pages.return_value = 100
 
+        mock_dependencies["db"].get_page_file_id.return_value = None
+
         # Mock bot methods
         mock_dependencies["bot"].send_message = AsyncMock()
-        mock_dependencies["bot"].send_photo = AsyncMock()
+        mock_dependencies["bot"].send_media_group = AsyncMock(return_value=[])
 
         await pdf_bot.send_pages_to_user(12345, 1)
 
-        # Check that initial message was sent
-        mock_dependencies["bot"].send_message.assert_called()
-        send_message_calls = mock_dependencies["bot"].send_message.call_args_list
-        assert any("page 1 of 100" in str(call).lower() for call in send_message_calls)
-
-        # Check that photos were sent
-        assert mock_dependencies["bot"].send_photo.call_count == 3
+        # Check that all pages went out as one album with the header on the first photo
+        mock_dependencies["bot"].send_message.assert_not_called()
+        mock_dependencies["bot"].send_media_group.assert_called_once()
+        media = mock_dependencies["bot"].send_media_group.call_args[1]["media"]
+        assert len(media) == 3
+        assert "page 1 of 100" in media[0].caption.lower()
+        assert [m.caption for m in media[1:]] == ["📖 page 2", "📖 page 3"]
 
         # Check that database was updated
         mock_dependencies["db"].update_last_sent.assert_called_once_with(12345)
 
+    @pytest.mark.asyncio
+    async def test_send_pages_to_user_uses_given_state(self, pdf_bot, mock_dependencies):
+        """Test that a UserState from the scheduler saves the per-user lookup"""
+        mock_dependencies["pdf_reader"].extract_pages_as_images.return_value = ["page_1.png"]
+        mock_dependencies["pdf_reader"].get_total_pages.return_value = 42
+        mock_dependencies["db"].get_page_file_id.return_value = None
+        mock_dependencies["bot"].send_photo = AsyncMock()
+        # total not counted yet when the state was read
+        state = UserState(exists=True, pdf_path="test.pdf", total_pages=0, user_id=12345)
+
+        await pdf_bot.send_pages_to_user(12345, 1, state=state)
+
+        mock_dependencies["db"].get_user_state.assert_not_called()
+        caption = mock_dependencies["bot"].send_photo.call_args[1]["caption"]
+        # the caption has the total the reader counted while rendering
+        assert "page 1 of 42" in caption
+
     @pytest.mark.asyncio
     async def test_send_pages_to_user_no_pages(self, pdf_bot, mock_dependencies):
         """Test sending pages when no pages are available"""
@@ -371,35 +409,12 @@ class TestPDFSenderBot:
     @pytest.mark.asyncio
     async def test_check_and_send_pages(self, pdf_bot, mock_dependencies):
         """Test checking and sending pages to all users"""
-        # Setup mock returns
-        mock_dependencies["db"].get_users.return_value = [
-            {"id": 123, "username": "user1"},
-            {"id": 456, "username": "user2"},
+        # Setup mock returns - never sent before, reading page 10 of 100
+        mock_dependencies["db"].get_scheduled_users.return_value = [
+            UserState(exists=True, pdf_path="test.pdf", current_page=10, total_pages=100, user_id=123),
+            UserState(exists=True, pdf_path="test.pdf", current_page=10, total_pages=100, user_id=456),
         ]
 
-        # Mock per-user database calls
-        def mock_get_pdf_path(user_id):
-            return "test.pdf"
-
-        def mock_get_last_sent(user_id):
-            return None  # Never sent before
-
-        def mock_get_current_page(user_id):
-            return 10
-
-        def mock_increment_page(user_id, increment):
-            assert increment == 3
-            return 13
-
-        def mock_get_total_pages(user_id):
-            return 100
-
-        mock_dependencies["db"].get_pdf_path.side_effect = mock_get_pdf_path
-        mock_dependencies["db"].get_last_sent.side_effect = mock_get_last_sent
-        mock_dependencies["db"].get_current_page.side_effect = mock_get_current_page
-        mock_dependencies["db"].get_total_pages.side_effect = mock_get_total_pages
-        mock_dependencies["db"].increment_page.side_effect = mock_increment_page
-
         # Mock send_pages_to_user method
         pdf_bot.send_pages_to_user = AsyncMock()
 
@@ -420,13 +435,14 @@ class TestPDFSenderBot:
 
         # Check that pages were sent to all users
         assert pdf_bot.send_pages_to_user.call_count == 2
-        pdf_bot.send_pages_to_user.assert_any_call(123, 10)
-        pdf_bot.send_pages_to_user.assert_any_call(456, 10)
+        users = mock_dependencies["db"].get_scheduled_users.return_value
+        pdf_bot.send_pages_to_user.assert_any_call(123, 10, state=users[0])
+        pdf_bot.send_pages_to_user.assert_any_call(456, 10, state=users[1])
 
     @pytest.mark.asyncio
     async def test_check_and_send_pages_no_users(self, pdf_bot, mock_dependencies):
         """Test checking and sending pages when no users exist"""
-        mock_dependencies["db"].get_users.return_value = []
+        mock_dependencies["db"].get_scheduled_users.return_value = []
 
         await pdf_bot.check_and_send_pages()
 
@@ -475,3 +491,235 @@ class TestPDFSenderBot:
         assert "✅" in call_args
         assert "🔒" in call_args
         mock_dependencies["keyboards"].achievements_menu.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_send_page_photo_reuses_file_id(self, pdf_bot, mock_dependencies):
+        """Test that a page uploaded before is sent by file_id instead of re-uploading"""
+        mock_dependencies["db"].get_page_file_id.return_value = "AgAD-file-id"
+        mock_dependencies["bot"].send_photo = AsyncMock()
+
+        await pdf_bot._send_page_photo(12345, "output/page_5_abc.jpg", caption="📖 page 5")
+
+        mock_dependencies["db"].get_page_file_id.assert_called_once_with("page_5_abc.jpg")
+        mock_dependencies["bot"].send_photo.assert_called_once_with(
+            chat_id=12345, photo="AgAD-file-id", caption="📖 page 5"
+        )
+        mock_dependencies["db"].set_page_file_id.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_send_page_photo_stores_new_file_id(self, pdf_bot, mock_dependencies):
+        """Test that the file_id of a fresh upload is remembered"""
+        mock_dependencies["db"].get_page_file_id.return_value = None
+        sent = Mock()
+        sent.photo = [Mock(file_id="small"), Mock(file_id="large")]
+        mock_dependencies["bot"].send_photo = AsyncMock(return_value=sent)
+
+        await pdf_bot._send_page_photo(12345, "output/page_5_abc.jpg", caption="📖 page 5")
+
+        assert isinstance(mock_dependencies["bot"].send_photo.call_args[1]["photo"], FSInputFile)
+        mock_dependencies["db"].set_page_file_id.assert_called_once_with("page_5_abc.jpg", "large")
+
+    @pytest.mark.asyncio
+    async def test_send_page_album_reuploads_stale_file_ids(self, pdf_bot, mock_dependencies):
+        """Test that a rejected cached file_id re-uploads the album and stores the new ids"""
+        mock_dependencies["db"].get_page_file_id.side_effect = ["old-id", None]
+        sent = [Mock(photo=[Mock(file_id="id-1")]), Mock(photo=[Mock(file_id="id-2")])]
+        mock_dependencies["bot"].send_media_group = AsyncMock(
+            side_effect=[TelegramBadRequest(method=Mock(), message="wrong file id"), sent]
+        )
+
+        await pdf_bot._send_page_album(
+            12345, ["output/page_1_a.jpg", "output/page_2_a.jpg"], ["📖 page 1", "📖 page 2"]
+        )
+
+        retry = mock_dependencies["bot"].send_media_group.call_args_list[1][1]["media"]
+        assert all(isinstance(m.media, FSInputFile) for m in retry)
+        assert mock_dependencies["db"].set_page_file_id.call_args_list == [
+            call("page_1_a.jpg", "id-1"),
+            call("page_2_a.jpg", "id-2"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_send_pages_to_user_failed_upload_keeps_page(self, pdf_bot, mock_dependencies):
+        """Test that a failed page upload doesn't move the bookmark forward"""
+        mock_dependencies["pdf_reader"].extract_pages_as_images.return_value = [
+            "page_1.png",
+            "page_2.png",
+        ]
+        mock_dependencies["db"].get_total_pages.return_value = 100
+        mock_dependencies["db"].get_page_file_id.return_value = None
+        mock_dependencies["bot"].send_message = AsyncMock()
+        mock_dependencies["bot"].send_media_group = AsyncMock(side_effect=RuntimeError("boom"))
+
+        await pdf_bot.send_pages_to_user(12345, 1)
+
+        mock_dependencies["bot"].send_media_group.assert_called_once()
+        mock_dependencies["db"].set_current_page.assert_not_called()
+        mock_dependencies["bot"].send_message.assert_called_with(
+            12345, "❌ error sending pages. try again later"
+        )
+
+    def test_pdf_available_caches_exists(self, pdf_bot):
+        """Test that the book existence check hits the filesystem once per TTL"""
+        with patch("main.os.path.exists", return_value=True) as mock_exists:
+            assert pdf_bot.pdf_available("test.pdf")
+            assert pdf_bot.pdf_available("test.pdf")
+            assert not pdf_bot.pdf_available(None)
+
+        mock_exists.assert_called_once_with("test.pdf")
+
+    def test_reader_is_reused_per_user(self, pdf_bot):
+        """Test that a user's PDFReader is built once and shared by later commands"""
+        with patch("main.PDFReader") as mock_reader_class:
+            first = pdf_bot._reader(12345)
+            second = pdf_bot._reader(12345)
+            pdf_bot._reader(67890)
+
+        assert first is second
+        assert mock_reader_class.call_count == 2
+
+    def test_reader_cache_is_bounded(self, pdf_bot):
+        """Test that the least recently used reader is dropped past READER_CACHE_SIZE"""
+        with patch("main.READER_CACHE_SIZE", 2), patch("main.PDFReader"):
+            pdf_bot._reader(1)
+            pdf_bot._reader(2)
+            pdf_bot._reader(1)
+            pdf_bot._reader(3)
+
+        assert list(pdf_bot._readers) == [1, 3]
+        # the evicted user's lock goes with the reader
+        assert set(pdf_bot._render_locks) == {1, 3}
+
+    @pytest.mark.asyncio
+    async def test_render_holds_the_reader_lock(self, pdf_bot, mock_dependencies):
+        """Test that rendering runs under the user's reader lock"""
+        held = []
+
+        def extract(start_page, count):
+            held.append(pdf_bot._render_locks[12345].locked())
+            return []
+
+        mock_dependencies["pdf_reader"].extract_pages_as_images.side_effect = extract
+
+        await pdf_bot._render_pages(12345, 1, 3)
+
+        assert held == [True]
+        assert not pdf_bot._render_locks[12345].locked()
+
+    @pytest.mark.asyncio
+    async def test_current_page_handler_without_image(self, pdf_bot, mock_message, mock_dependencies):
+        """Test that /current falls back to text when the page can't be rendered"""
+        mock_dependencies["db"].get_user.return_value = {"id": 12345}
+        mock_dependencies["db"].get_pdf_path.return_value = "test.pdf"
+        mock_dependencies["db"].get_current_page.return_value = 15
+        mock_dependencies["db"].get_total_pages.return_value = 100
+        mock_dependencies["pdf_reader"].extract_pages_as_images.return_value = []
+        mock_dependencies["bot"].send_photo = AsyncMock()
+
+        with patch("main.os.path.exists", return_value=True):
+            await pdf_bot.current_page_handler(mock_message)
+
+        mock_dependencies["bot"].send_photo.assert_not_called()
+        text = mock_message.answer.call_args[0][0]
+        assert "Страница: 15/100" in text
+        assert "Не удалось отобразить изображение" in text
+
+    @pytest.mark.asyncio
+    async def test_send_pages_to_user_prerenders_next_batch(self, pdf_bot, mock_dependencies):
+        """Test that the following pages are rendered in the background after a send"""
+        mock_dependencies["pdf_reader"].extract_pages_as_images.return_value = [
+            "page_1.png",
+            "page_2.png",
+            "page_3.png",
+        ]
+        mock_dependencies["db"].get_total_pages.return_value = 100
+        mock_dependencies["db"].get_page_file_id.return_value = None
+        mock_dependencies["bot"].send_message = AsyncMock()
+        mock_dependencies["bot"].send_media_group = AsyncMock(return_value=[])
+
+        await pdf_bot.send_pages_to_user(12345, 1)
+        await asyncio.gather(*pdf_bot._prerender_tasks)
+
+        calls = mock_dependencies["pdf_reader"].extract_pages_as_images.call_args_list
+        assert [c.args for c in calls] == [(1, 3), (4, 3)]
+
+    @pytest.mark.asyncio
+    async def test_check_and_send_pages_returns_next_due(self, pdf_bot, mock_dependencies):
+        """Test that the earliest next send time comes back for the scheduler"""
+        now = datetime.now()
+        mock_dependencies["db"].get_scheduled_users.return_value = [
+            UserState(exists=True, pdf_path="a.pdf", current_page=1, total_pages=100,
+                      last_sent=now - timedelta(hours=2), user_id=123),
+            UserState(exists=True, pdf_path="b.pdf", current_page=1, total_pages=100,
+                      last_sent=now - timedelta(hours=5), user_id=456),
+        ]
+        mock_dependencies["user_settings"].get_user_settings.return_value = {
+            "auto_send_enabled": True,
+            "schedule_time": "disabled",
+            "interval_hours": 6,
+            "pages_per_send": 3,
+        }
+        pdf_bot.send_pages_to_user = AsyncMock()
+
+        with patch("main.os.path.exists", return_value=True):
+            next_due = await pdf_bot.check_and_send_pages()
+
+        pdf_bot.send_pages_to_user.assert_not_called()
+        assert next_due == now + timedelta(hours=1)
+        mock_dependencies["db"].get_scheduled_users.assert_called_once_with()
+
+    @pytest.mark.asyncio
+    async def test_check_and_send_pages_runs_one_at_a_time(self, pdf_bot, mock_dependencies):
+        """Test that overlapping scheduler runs don't process users in parallel"""
+        mock_dependencies["db"].get_scheduled_users.return_value = [UserState(exists=True, user_id=123)]
+        active = []
+        overlaps = []
+
+        async def slow_process(user, now):
+            overlaps.append(bool(active))
+            active.append(user)
+            await asyncio.sleep(0.01)
+            active.remove(user)
+
+        pdf_bot._process_scheduled_user = slow_process
+
+        await asyncio.gather(pdf_bot.check_and_send_pages(), pdf_bot.check_and_send_pages())
+
+        assert overlaps == [False, False]
+
+    @pytest.mark.asyncio
+    async def test_check_and_send_pages_survives_one_failing_user(self, pdf_bot, mock_dependencies):
+        """Test that an error for one user still returns the others' next due time"""
+        now = datetime.now()
+        mock_dependencies["db"].get_scheduled_users.return_value = [
+            UserState(exists=True, user_id=123),
+            UserState(exists=True, user_id=456),
+        ]
+        pdf_bot._process_scheduled_user = AsyncMock(
+            side_effect=[RuntimeError("boom"), now + timedelta(hours=2)]
+        )
+
+        next_due = await pdf_bot.check_and_send_pages()
+
+        assert pdf_bot._process_scheduled_user.call_count == 2
+        assert next_due == now + timedelta(hours=2)
+
+    def test_parse_page_number(self, pdf_bot):
+        """Test /goto argument parsing"""
+        assert pdf_bot._parse_page_number("/goto 25") == 25
+        assert pdf_bot._parse_page_number("/goto@PdfSenderBot  7 ") == 7
+        assert pdf_bot._parse_page_number("/goto") is None
+        assert pdf_bot._parse_page_number("/goto abc") is None
+        assert pdf_bot._parse_page_number("/goto 5 6") is None
+        assert pdf_bot._parse_page_number("/goto 5\nextra") is None
+        assert pdf_bot._parse_page_number("/goto " + "9" * 5000) is None
+
+    @pytest.mark.asyncio
+    async def test_dispatch_command_routes_by_name(self, pdf_bot, mock_message):
+        """Test that table-registered commands reach their handler"""
+        pdf_bot.commands["next"] = AsyncMock()
+        command = CommandObject(prefix="/", command="next")
+
+        await pdf_bot._dispatch_command(mock_message, command)
+
+        pdf_bot.commands["next"].assert_called_once_with(mock_message)
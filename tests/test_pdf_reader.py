@@ -1,10 +1,14 @@
 import os
 import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from unittest.mock import Mock, patch
 
+import fitz as pymupdf
 import pytest
 
-from pdf_reader import PDFReader
+from pdf_reader import PageImageCache, PDFReader, RenderPool, _render_page
 
 
 class TestPDFReader:
@@ -61,6 +65,21 @@ class TestPDFReader:
         mock_doc.close.assert_called_once()
         pdf_reader.db.set_total_pages.assert_called_once_with(123, 50)
 
+    @patch("pdf_reader.pymupdf.open")
+    def test_get_total_pages_cached_until_file_changes(self, mock_pymupdf_open, pdf_reader):
+        """Test that the page count is read once per version of the file"""
+        mock_doc = Mock()
+        mock_doc.__len__ = Mock(return_value=50)
+        mock_pymupdf_open.return_value = mock_doc
+
+        assert pdf_reader.get_total_pages() == 50
+        assert pdf_reader.get_total_pages() == 50
+        assert mock_pymupdf_open.call_count == 1
+
+        os.utime(pdf_reader.pdf_path, ns=(0, 0))
+        assert pdf_reader.get_total_pages() == 50
+        assert mock_pymupdf_open.call_count == 2
+
     @patch("pdf_reader.pymupdf.open")
     def test_get_total_pages_error(self, mock_pymupdf_open, pdf_reader):
         """Test error handling when getting total pages"""
@@ -81,19 +100,141 @@ class TestPDFReader:
 
         mock_doc.load_page.return_value = mock_page
         mock_page.get_pixmap.return_value = mock_pix
+        mock_pix.save.side_effect = lambda path, **kwargs: open(path, "wb").close()
         mock_pymupdf_open.return_value = mock_doc
 
         page_number = 5
         result_path = pdf_reader.extract_page_as_image(page_number)
 
-        expected_path = os.path.join(pdf_reader.output_dir, f"page_{page_number}.jpg")
-        assert result_path == expected_path
+        assert os.path.dirname(result_path) == pdf_reader.output_dir
+        assert os.path.basename(result_path).startswith(f"page_{page_number}_")
+        assert result_path.endswith(".jpg")
 
         mock_doc.load_page.assert_called_once_with(page_number - 1)  # 0-based indexing
         mock_page.get_pixmap.assert_called_once_with(dpi=150)
-        mock_pix.save.assert_called_once_with(expected_path, jpg_quality=85)
+        part_path = mock_pix.save.call_args[0][0]
+        assert part_path.startswith(result_path + ".") and part_path.endswith(".part")
+        assert mock_pix.save.call_args[1] == {"output": "jpeg", "jpg_quality": 85}
+        assert os.path.exists(result_path)
         mock_doc.close.assert_called_once()
 
+    def test_extract_page_served_from_cache(self, temp_output_dir):
+        """Test that a second render of the same page skips MuPDF"""
+        pdf_path = os.path.join(temp_output_dir, "book.pdf")
+        doc = pymupdf.open()
+        doc.new_page()
+        doc.save(pdf_path)
+        doc.close()
+        reader = PDFReader(pdf_path=pdf_path, output_dir=temp_output_dir, db=Mock())
+
+        first = reader.extract_page_as_image(1)
+        with patch("pdf_reader.pymupdf.open") as mock_open:
+            second = reader.extract_page_as_image(1)
+
+        mock_open.assert_not_called()
+        assert first == second
+        assert os.path.exists(first)
+
+    def test_extract_page_shared_by_identical_books(self, temp_output_dir):
+        """Test that two copies of the same book reuse one rendered page"""
+        doc = pymupdf.open()
+        doc.new_page()
+        first_path = os.path.join(temp_output_dir, "mine.pdf")
+        doc.save(first_path)
+        doc.close()
+        second_path = os.path.join(temp_output_dir, "theirs.pdf")
+        with open(first_path, "rb") as src, open(second_path, "wb") as dst:
+            dst.write(src.read())
+
+        first = PDFReader(pdf_path=first_path, output_dir=temp_output_dir, db=Mock())
+        second = PDFReader(pdf_path=second_path, output_dir=temp_output_dir, db=Mock())
+        rendered = first.extract_page_as_image(1)
+        with patch("pdf_reader.pymupdf.open") as mock_open:
+            assert second.extract_page_as_image(1) == rendered
+            # a fresh cache (bot restart) picks the file up from disk
+            with patch("pdf_reader.page_cache", PageImageCache(10, 1024 * 1024)):
+                assert second.extract_page_as_image(1) == rendered
+
+        mock_open.assert_not_called()
+
+    def test_extract_page_in_render_pool(self, temp_output_dir, caplog):
+        """Test that pages rendered in a worker process still land in the cache"""
+        pdf_path = os.path.join(temp_output_dir, "pooled.pdf")
+        doc = pymupdf.open()
+        doc.new_page()
+        doc.save(pdf_path)
+        doc.close()
+
+        pool = RenderPool(max_workers=1)
+        try:
+            reader = PDFReader(
+                pdf_path=pdf_path, output_dir=temp_output_dir, db=Mock(), render_pool=pool
+            )
+            first = reader.extract_page_as_image(1)
+            missing = reader.extract_page_as_image(2)
+            second = reader.extract_page_as_image(1)
+            # the worker's warning makes it back to this process, a bit later
+            # than the render result
+            deadline = time.monotonic() + 5
+            while "Page 2 is out of range" not in caplog.text and time.monotonic() < deadline:
+                time.sleep(0.05)
+        finally:
+            pool.shutdown()
+
+        assert os.path.exists(first)
+        assert missing is None
+        assert first == second
+        assert "Page 2 is out of range" in caplog.text
+
+    def test_render_page_in_spawned_worker(self, temp_output_dir):
+        """Test that _render_page runs in a real worker process and writes a jpeg"""
+        pdf_path = os.path.join(temp_output_dir, "spawned.pdf")
+        doc = pymupdf.open()
+        doc.new_page()
+        doc.save(pdf_path)
+        doc.close()
+        output_path = os.path.join(temp_output_dir, "page_1_abc.jpg")
+
+        pool = RenderPool(max_workers=1)
+        try:
+            # the worker imports pdf_reader (and its config) from scratch
+            assert pool.run(os.getpid) != os.getpid()
+            assert pool.run(_render_page, pdf_path, 1, 72, 80, output_path) is True
+            assert pool.run(_render_page, pdf_path, 2, 72, 80, output_path) is False
+        finally:
+            pool.shutdown()
+
+        with open(output_path, "rb") as f:
+            assert f.read(3) == b"\xff\xd8\xff"
+        # no .part file left behind
+        assert sorted(os.listdir(temp_output_dir)) == ["page_1_abc.jpg", "spawned.pdf"]
+
+    def test_render_pool_recovers_from_dead_worker(self):
+        """Test that a worker crash doesn't break every later render"""
+        pool = RenderPool(max_workers=1)
+        try:
+            with pytest.raises(BrokenProcessPool):
+                pool.run(os._exit, 1)
+            assert pool.run(abs, -3) == 3
+        finally:
+            pool.shutdown()
+
+    def test_page_cache_eviction_deletes_files(self, temp_output_dir):
+        """Test that the page cache removes evicted images from disk"""
+        cache = PageImageCache(max_entries=2, max_bytes=1024 * 1024)
+        paths = []
+        for i in range(3):
+            path = os.path.join(temp_output_dir, f"page_{i}_x.jpg")
+            with open(path, "wb") as f:
+                f.write(b"jpeg")
+            cache.put(i, path)
+            paths.append(path)
+
+        assert not os.path.exists(paths[0])
+        assert cache.get(0) is None
+        assert cache.get(2) == paths[2]
+        assert len(cache) == 2
+
     @patch("pdf_reader.pymupdf.open")
     def test_extract_page_out_of_range(self, mock_pymupdf_open, pdf_reader):
         """Test extracting page that's out of range"""
@@ -148,6 +289,19 @@ class TestPDFReader:
         assert result_paths == expected_paths
         assert mock_extract_page.call_count == 2
 
+    @patch("pdf_reader.PDFReader.extract_page_as_image")
+    @patch("pdf_reader.PDFReader.get_total_pages")
+    def test_extract_pages_stops_at_failed_page(
+        self, mock_get_total, mock_extract_page, pdf_reader
+    ):
+        """Test that a page that can't be rendered ends the batch instead of leaving a gap"""
+        mock_get_total.return_value = 100
+        mock_extract_page.side_effect = lambda page, dpi: None if page == 6 else f"page_{page}.png"
+
+        result_paths = pdf_reader.extract_pages_as_images(5, 3)
+
+        assert result_paths == ["page_5.png"]
+
     @patch("pdf_reader.pymupdf.open")
     def test_get_page_info(self, mock_pymupdf_open, pdf_reader):
         """Test getting page information"""
@@ -209,6 +363,38 @@ class TestPDFReader:
         assert "page_1.png" not in remaining_files
         assert "page_2.png" not in remaining_files
 
+    def test_cleanup_images_digest_names(self, pdf_reader):
+        """Test that current page_<n>_<digest>.jpg names are cleaned up too"""
+        for name in ("page_1_0a1b2c.jpg", "page_2_0a1b2c.jpg", "page_3_ffee00.jpg"):
+            with open(os.path.join(pdf_reader.output_dir, name), "w") as f:
+                f.write("test")
+
+        pdf_reader.cleanup_images(keep_latest=1)
+
+        assert os.listdir(pdf_reader.output_dir) == ["page_3_ffee00.jpg"]
+
+    def test_concurrent_renders_of_same_page(self, temp_output_dir):
+        """Test that readers racing on one shared page all get the image"""
+        pdf_path = os.path.join(temp_output_dir, "shared.pdf")
+        doc = pymupdf.open()
+        doc.new_page()
+        doc.save(pdf_path)
+        doc.close()
+        readers = [
+            PDFReader(pdf_path=pdf_path, output_dir=temp_output_dir, db=Mock())
+            for _ in range(8)
+        ]
+
+        with patch("pdf_reader.page_cache", PageImageCache(10, 1024 * 1024)), \
+                patch("pdf_reader.os.path.exists", side_effect=lambda p: not p.endswith(".jpg")):
+            # every reader misses both the cache and the file on disk
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                results = list(pool.map(lambda r: r.extract_page_as_image(1), readers))
+
+        assert None not in results
+        assert len(set(results)) == 1
+        assert not [name for name in os.listdir(temp_output_dir) if name.endswith(".part")]
+
     def test_ensure_output_dir(self, mock_pdf_file):
         """Test output directory creation"""
         with tempfile.TemporaryDirectory() as temp_dir:
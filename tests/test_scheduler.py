@@ -0,0 +1,55 @@
+"""
+Tests for the page sending scheduler
+"""
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+import pytest
+
+from scheduler import PDFScheduler
+
+
+@contextmanager
+def running_scheduler():
+    """PDFScheduler with a mock bot, started in the current event loop"""
+    pdf_scheduler = PDFScheduler(Mock())
+    pdf_scheduler.start()
+    try:
+        yield pdf_scheduler
+    finally:
+        pdf_scheduler.scheduler.shutdown(wait=False)
+
+
+class TestPDFScheduler:
+    @pytest.mark.asyncio
+    async def test_next_due_keeps_earlier_pending_run(self):
+        """Test that a later wakeup doesn't replace an earlier one"""
+        now = datetime.now().astimezone()
+        with running_scheduler() as scheduler:
+            scheduler._schedule_next_due(now + timedelta(minutes=10))
+            scheduler._schedule_next_due(now + timedelta(minutes=30))
+
+            job = scheduler.scheduler.get_job("next_due_pages")
+            assert job.next_run_time == now + timedelta(minutes=10)
+
+    @pytest.mark.asyncio
+    async def test_next_due_moves_pending_run_earlier(self):
+        """Test that an earlier wakeup replaces a later pending one"""
+        now = datetime.now().astimezone()
+        with running_scheduler() as scheduler:
+            scheduler._schedule_next_due(now + timedelta(minutes=30))
+            scheduler._schedule_next_due(now + timedelta(minutes=10))
+
+            job = scheduler.scheduler.get_job("next_due_pages")
+            assert job.next_run_time == now + timedelta(minutes=10)
+
+    @pytest.mark.asyncio
+    async def test_next_due_after_regular_tick_is_skipped(self):
+        """Test that no early run is added when the interval job comes first"""
+        with running_scheduler() as scheduler:
+            interval_run = scheduler.scheduler.get_job("interval_pages").next_run_time
+            scheduler._schedule_next_due(interval_run + timedelta(minutes=5))
+
+            assert scheduler.scheduler.get_job("next_due_pages") is None